@@ -0,0 +1,70 @@
+# usage: python -m benchmarks.bench [pattern ...] [--save benchmarks/baseline.json] [--compare benchmarks/baseline.json]
+
+from .scenarios import SCENARIOS
+from cropbox.logger import logger
+
+import argparse
+import fnmatch
+import json
+import sys
+import time
+import tracemalloc
+
+def measure(setup, repeat=3):
+    # best rate of repeated runs, then peak memory of a separate traced run as tracing slows it down
+    rates = []
+    for _ in range(repeat):
+        run = setup()
+        t = time.perf_counter()
+        n = run()
+        rates.append(n / (time.perf_counter() - t))
+    tracemalloc.start()
+    try:
+        setup()()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'rate': max(rates), 'peak': peak}
+
+def compare(results, baseline, threshold):
+    # regressions where rate dropped or peak memory grew beyond threshold
+    R = []
+    for k, r in results.items():
+        b = baseline.get(k)
+        if b is None:
+            continue
+        if r['rate'] < b['rate'] * (1 - threshold):
+            R.append(f"{k}: rate {r['rate']:.1f} < {b['rate']:.1f} steps/s")
+        # ignore noise of small allocations
+        if r['peak'] > b['peak'] * (1 + threshold) + 2**16:
+            R.append(f"{k}: peak {r['peak']} > {b['peak']} bytes")
+    return R
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description='run cropbox benchmarks')
+    p.add_argument('pattern', nargs='*', default=['*'], help='scenario names (glob)')
+    p.add_argument('--repeat', type=int, default=3)
+    p.add_argument('--save', help='save results as baseline JSON')
+    p.add_argument('--compare', help='compare against baseline JSON')
+    p.add_argument('--threshold', type=float, default=0.2, help='relative change flagged as regression')
+    a = p.parse_args(argv)
+    logger.disable('cropbox')
+    names = [k for k in SCENARIOS if any(fnmatch.fnmatch(k, q) for q in a.pattern)]
+    results = {}
+    for k in names:
+        results[k] = r = measure(SCENARIOS[k], a.repeat)
+        print(f"{k:<24} {r['rate']:>12.1f} steps/s {r['peak'] / 2**20:>10.2f} MiB", flush=True)
+    if a.save:
+        with open(a.save, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    if a.compare:
+        with open(a.compare) as f:
+            baseline = json.load(f)
+        R = compare(results, baseline, a.threshold)
+        for r in R:
+            print(f'REGRESSION {r}')
+        return 1 if R else 0
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
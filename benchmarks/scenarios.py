@@ -0,0 +1,188 @@
+from cropbox.system import System
+from cropbox.context import instance
+from cropbox.statevar import accumulate, constant, derive, flag, parameter, produce
+from cropbox.track import Track, Accumulate
+from cropbox.unit import U
+
+import functools
+import os
+import sys
+
+# reference models live with the tests
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, 'tests')]
+
+# {name: setup} where setup() returns a function running the measured work and returning number of steps
+SCENARIOS = {}
+
+def scenario(name, **kwargs):
+    def decorator(f):
+        SCENARIOS[name] = functools.partial(f, **kwargs)
+        return f
+    return decorator
+
+class LotkaVolterra(System):
+    @parameter(alias='a')
+    def prey_birth_rate(self):
+        return 1.0
+
+    @parameter(alias='b')
+    def prey_death_rate(self):
+        return 0.1
+
+    @parameter(alias='c')
+    def predator_death_rate(self):
+        return 1.5
+
+    @parameter(alias='d')
+    def predator_reproduction_rate(self):
+        return 0.75
+
+    @parameter(alias='H0')
+    def prey_initial_population(self):
+        return 10
+
+    @parameter(alias='P0')
+    def predator_initial_population(self):
+        return 5
+
+    @accumulate(alias='H', init='H0')
+    def prey_population(self, a, b, H, P):
+        return a*H - b*H*P
+
+    @accumulate(alias='P', init='P0')
+    def predator_population(self, b, c, d, H, P):
+        return d*b*H*P - c*P
+
+@scenario('lotka_volterra-100', n=100)
+@scenario('lotka_volterra-1000', n=1000)
+def lotka_volterra(n):
+    s = instance(LotkaVolterra, config={'Clock': {'interval': 0.01}})
+    def run():
+        for _ in range(n):
+            s.context.advance()
+        return n
+    return run
+
+class Root(System):
+    @derive(unit='cm / 1')
+    def elongation_rate(self):
+        return self.rng.normal(1.0, 0.2)
+
+    @constant(unit='deg')
+    def branching_angle(self):
+        return self.rng.normal(20, 10)
+
+    @parameter(unit='cm')
+    def branching_interval(self):
+        return 3.0
+
+    @parameter
+    def branching_chance(self):
+        return 0.5
+
+    @flag(prob='branching_chance')
+    def is_branching(self, l='length', ll='last_branching_length', i='branching_interval'):
+        return l - ll > i
+
+    @constant(unit='cm')
+    def branched_length(self):
+        return None
+
+    @accumulate(unit='cm')
+    def length(self):
+        return self.elongation_rate
+
+    @derive(unit='cm')
+    def last_branching_length(self):
+        if self.is_branching:
+            return self.length
+
+    @produce
+    def branch(self):
+        if self.is_branching:
+            return (Root, {'branched_length': self.length})
+
+@scenario('root_structure-100', n=100)
+def root_structure(n):
+    # grow until n segments
+    r = instance(Root, config={'Context': {'seed': 0}})
+    def run():
+        i = 0
+        while len(r.collect()) < n:
+            r.context.advance()
+            i += 1
+        return i
+    return run
+
+@scenario('garlic-24', n=24)
+def garlic(n):
+    from garlic.test_phenology import config
+    from garlic.physiology.plant import Plant
+    p = instance(Plant, config)
+    def run():
+        for _ in range(n):
+            p.context.advance()
+        return n
+    return run
+
+@scenario('gas_exchange-10', n=10)
+def gas_exchange(n):
+    import test_photosynthesis as tp
+    ge = instance(tp.GasExchange, tp.config)
+    def run():
+        for _ in range(n):
+            ge.context.advance()
+        return n
+    return run
+
+class Micro(System):
+    @derive
+    def a(self):
+        return 1
+
+    @derive
+    def b(self, a, c=2):
+        return a + c
+
+@scenario('var.compute', n=10000)
+def var_compute(n):
+    s = instance(Micro)
+    v = Micro._trackable['b']
+    def run():
+        for _ in range(n):
+            v.compute(s)
+        return n
+    return run
+
+@scenario('Track.check', n=100000)
+def track_check(n):
+    tr = Track(0, 0)
+    def run():
+        for t in range(n):
+            tr.check(t, '')
+            tr.check(t, '')
+        return n
+    return run
+
+@scenario('Accumulate.store', n=10000)
+def accumulate_store(n):
+    tr = Accumulate(0, 0)
+    r = lambda: 1
+    def run():
+        for t in range(n):
+            tr.check(t, '')
+            tr.store(r)
+            tr.poststore(r)()
+        return n
+    return run
+
+@scenario('U', n=10000)
+def unit(n):
+    U(1, 'm')
+    def run():
+        for _ in range(n):
+            U(1.0, 'm')
+            U('1 m')
+        return n
+    return run
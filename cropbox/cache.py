@@ -0,0 +1,180 @@
+from .logger import logger
+
+import glob
+import hashlib
+import inspect
+import os
+import shutil
+import sys
+
+import numpy as np
+
+# bump when the layout of cached files changes
+VERSION = 1
+
+def directory():
+    d = os.environ.get('CROPBOX_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'cropbox'))
+    os.makedirs(d, exist_ok=True)
+    return d
+
+def limit():
+    # total size of cached runs in bytes before least recently used ones get evicted
+    return int(os.environ.get('CROPBOX_CACHE_LIMIT', 1 << 30))
+
+def digest(*keys, files=()):
+    h = hashlib.sha1()
+    h.update(repr(VERSION).encode())
+    for f in files:
+        with open(f, 'rb') as fp:
+            for b in iter(lambda: fp.read(1 << 20), b''):
+                h.update(b)
+    for k in keys:
+        h.update(repr(k).encode())
+    return h.hexdigest()
+
+def save_dataframe(df, path):
+    import pandas as pd
+    index = df.index
+    tz = getattr(index, 'tz', None)
+    arrays = {f'column:{k}': df[k].to_numpy() for k in df.columns}
+    if isinstance(index, pd.DatetimeIndex):
+        # store as naive UTC, timezone is restored on load
+        if tz:
+            index = index.tz_convert('UTC').tz_localize(None)
+        arrays['index'] = index.to_numpy().astype('datetime64[ns]')
+        arrays['meta'] = np.array([str(tz) if tz else '', index.name or ''])
+    else:
+        arrays['index'] = index.to_numpy()
+        arrays['meta'] = np.array([None, index.name or ''], dtype=object)
+    #HACK: write to temporary file first so that concurrent workers never see a partial file
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'wb') as f:
+        np.savez(f, **arrays)
+    os.replace(tmp, path)
+
+def load_dataframe(path):
+    import pandas as pd
+    with np.load(path, allow_pickle=True) as z:
+        columns = {k[len('column:'):]: z[k] for k in z.files if k.startswith('column:')}
+        tz, name = z['meta']
+        if tz is None:
+            index = pd.Index(z['index'], name=name or None)
+        else:
+            index = pd.DatetimeIndex(z['index'], name=name or None)
+            if tz:
+                index = index.tz_localize('UTC').tz_convert(tz)
+    return pd.DataFrame(columns, index=index)
+
+def driver(build, *keys, files=(), name='driver', mmap=True):
+    from .driver import Driver
+    path = os.path.join(directory(), f'{name}-{digest(*keys, files=files)}')
+    try:
+        return Driver.load(path, mmap=mmap)
+    except (FileNotFoundError, OSError, KeyError, ValueError):
+        d = build()
+        tmp = f'{path}.{os.getpid()}.tmp'
+        shutil.rmtree(tmp, ignore_errors=True)
+        d.save(tmp)
+        try:
+            os.replace(tmp, path)
+        except OSError:
+            # another worker got there first
+            shutil.rmtree(tmp, ignore_errors=True)
+        return Driver.load(path, mmap=mmap)
+
+def table(build, *keys, name='table'):
+    from .surrogate import Table
+    path = os.path.join(directory(), f'{name}-{digest(*keys)}.npz')
+    try:
+        return Table.load(path)
+    except (FileNotFoundError, OSError, KeyError, ValueError):
+        t = build()
+        tmp = f'{path}.{os.getpid()}.tmp'
+        t.save(tmp)
+        os.replace(tmp, path)
+        return t
+
+def classes(cls):
+    # System classes reachable from cls through bases and system vars
+    C = set()
+    Q = [cls]
+    while Q:
+        c = Q.pop()
+        if c in C:
+            continue
+        C.add(c)
+        Q.extend(b for b in c.mro()[1:] if b is not object)
+        for v in getattr(c, '_trackable_system', {}).values():
+            f = v._wrapped_fun
+            if isinstance(f, type):
+                Q.append(f)
+    return C
+
+def getsource(cls):
+    try:
+        return inspect.getsource(cls)
+    except (OSError, TypeError):
+        pass
+    # class of interactive module may be located only by code of its functions
+    F = [getattr(v, '_wrapped_fun', v) for k, v in sorted(cls.__dict__.items())]
+    try:
+        S = [inspect.getsource(f) for f in F if inspect.isfunction(f)]
+    except (OSError, TypeError):
+        return None
+    return S or None
+
+def source(cls):
+    # digest of source files of modules reachable from cls and all files of their top-level packages,
+    # covering classes only known at run time (i.e. @produce) and cropbox itself,
+    # or of class sources when defined interactively (i.e. notebook), None if unknown
+    from . import __version__
+    F, S = set(), []
+    for c in sorted(classes(cls), key=lambda c: (c.__module__, c.__qualname__)):
+        m = sys.modules.get(c.__module__)
+        f = getattr(m, '__file__', None)
+        if f is not None and os.path.isfile(f):
+            F.add(os.path.abspath(f))
+        else:
+            # no file behind module, i.e. '<stdin>' or '<ipython-input-1>'
+            s = getsource(c)
+            if s is None:
+                return None
+            S.append(s)
+        p = sys.modules.get(c.__module__.split('.')[0])
+        for d in getattr(p, '__path__', []):
+            F.update(os.path.abspath(f) for f in glob.glob(os.path.join(d, '**', '*.py'), recursive=True))
+    return digest(__version__, S, files=sorted(F))
+
+def canonical(config):
+    # config with sorted keys so that equivalent dicts share the same key
+    if isinstance(config, dict):
+        return sorted((k, canonical(v)) for k, v in config.items())
+    return config
+
+def run(build, systemcls, config, steps, outputs, name='run'):
+    src = source(systemcls)
+    if src is None:
+        logger.warning(f'cache: source of {systemcls.__qualname__} not found, run is not cached')
+        return build()
+    key = digest(systemcls.__module__, systemcls.__qualname__, src, canonical(config or {}), steps, list(outputs))
+    path = os.path.join(directory(), f'{name}-{key}.npz')
+    try:
+        df = load_dataframe(path)
+    except (FileNotFoundError, OSError, KeyError, ValueError):
+        df = build()
+        save_dataframe(df, path)
+        evict(limit(), name)
+    else:
+        # mark as recently used
+        os.utime(path)
+    return df
+
+def evict(size, name='run'):
+    # remove least recently used files until total size fits
+    P = sorted(glob.glob(os.path.join(directory(), f'{name}-*.npz')), key=os.path.getmtime)
+    total = sum(os.path.getsize(p) for p in P)
+    for p in P:
+        if total <= size:
+            break
+        total -= os.path.getsize(p)
+        os.remove(p)
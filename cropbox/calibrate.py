@@ -0,0 +1,84 @@
+from .run import configure, executor, run
+from .logger import logger
+
+import numpy as np
+import scipy.optimize
+
+def rmse(obs, sim):
+    # sum of root mean squared errors over observed columns, missing observations are skipped
+    sim = sim.reindex(obs.index, method='nearest')
+    E = [np.sqrt(np.nanmean((obs[k].to_numpy(dtype=float) - sim[k].to_numpy(dtype=float))**2)) for k in obs.columns]
+    return float(np.sum(E))
+
+class Objective:
+    # picklable loss of a parameter vector for evaluation in worker processes
+    def __init__(self, systemcls, names, obs, loss, config, steps):
+        self.systemcls = systemcls
+        self.names = names
+        self.obs = obs
+        self.loss = loss
+        self.config = config
+        self.steps = steps
+
+    def __call__(self, x):
+        config = configure(self.config, dict(zip(self.names, x)))
+        try:
+            sim = run(self.systemcls, config, self.steps, list(self.obs.columns))
+        except Exception as e:
+            # parameters leading to failed simulation are just rejected
+            logger.warning(f'calibrate: {dict(zip(self.names, x))} failed ({e!r})')
+            return np.inf
+        return self.loss(self.obs, sim)
+
+def calibrate(systemcls, params, obs, steps, loss=rmse, config=None, popsize=15, maxiter=100, mutation=0.7, recombination=0.9, tol=0.01, atol=0, target=None, workers=1, seed=None, memo=None):
+    # differential evolution (rand/1/bin) over params: {'Section.name': (lower, upper)}
+    # obs: DataFrame of observed outputs indexed by context time
+    # population of each generation is evaluated at once, in worker processes unless workers == 1
+    # memo: dict of already evaluated parameter vectors, can be reused across calls
+    names = list(params)
+    L, H = np.array([params[k] for k in names], dtype=float).T
+    d = len(names)
+    n = max(popsize * d, 4)
+    rng = np.random.default_rng(seed)
+    f = Objective(systemcls, names, obs, loss, config, steps)
+    memo = {} if memo is None else memo
+    nfev = 0
+    def evaluate(P, map):
+        nonlocal nfev
+        X = [tuple(L + p * (H - L)) for p in P]
+        Y = [x for x in dict.fromkeys(X) if x not in memo]
+        nfev += len(Y)
+        memo.update(zip(Y, map(f, Y)))
+        return np.array([memo[x] for x in X])
+    with executor(workers) as map:
+        # latin hypercube initialization
+        P = (rng.permuted(np.tile(np.arange(n), (d, 1)), axis=1).T + rng.random((n, d))) / n
+        F = evaluate(P, map)
+        nit, message = 0, 'maximum number of iterations reached'
+        for nit in range(1, maxiter + 1):
+            b = np.argmin(F)
+            logger.debug(f'calibrate: #{nit} loss = {F[b]}')
+            if target is not None and F[b] <= target:
+                message = 'target loss reached'
+                break
+            if np.all(np.isfinite(F)) and np.std(F) <= atol + tol * abs(np.mean(F)):
+                message = 'population converged'
+                break
+            R = np.array([rng.choice(np.delete(np.arange(n), i), 3, replace=False) for i in range(n)])
+            M = np.clip(P[R[:, 0]] + mutation * (P[R[:, 1]] - P[R[:, 2]]), 0, 1)
+            C = rng.random((n, d)) < recombination
+            C[np.arange(n), rng.integers(d, size=n)] = True
+            T = np.where(C, M, P)
+            FT = evaluate(T, map)
+            better = FT <= F
+            P[better], F[better] = T[better], FT[better]
+    b = np.argmin(F)
+    x = L + P[b] * (H - L)
+    return scipy.optimize.OptimizeResult(
+        x=dict(zip(names, x)),
+        fun=F[b],
+        nit=nit,
+        nfev=nfev,
+        success=message != 'maximum number of iterations reached',
+        message=message,
+    )
@@ -1,12 +1,18 @@
-from .system import System
-from .statevar import accumulate, derive, parameter, system, Priority
-import toml
+from .system import System, flatten
+from .statevar import derive, flag, parameter, system, Priority
+from .track import Accumulate, Difference
+from .unit import U
 
 from collections import defaultdict
+import heapq
+import itertools
+import numpy as np
 
 class Clock(System):
     def __init__(self):
         self._tick = 0
+        self._time = None
+        self._step = None
         super().__init__()
 
     @parameter(init=None)
@@ -21,17 +27,42 @@ class Clock(System):
     def interval(self):
         return 1
 
+    @parameter
+    def adaptive(self):
+        return False
+
+    @parameter
+    def tolerance(self):
+        # local error of accumulates allowed per step relative to their values
+        return 0.01
+
+    @parameter(unit='unit')
+    def min_interval(self, interval):
+        # adaptive steps are multiples of min_interval
+        return interval
+
+    @parameter(unit='unit')
+    def max_interval(self, interval):
+        return 10 * interval
+
     @property
     def tick(self):
         return self._tick
 
+    @property
+    def step(self):
+        # length of current step, same as interval unless adaptive
+        return self.interval if self._step is None else self._step
+
     def advance(self):
+        self._time = self.time + self.step
         self._tick += 1
         self.update()
 
-    @accumulate(time='tick', init='start', unit='unit')
+    @derive(time='tick', init='start', unit='unit')
     def time(self):
-        return self.interval
+        # accumulated over steps of varying length, see advance()
+        return self.start if self._time is None else self._time
 
     @parameter(init=None)
     def start_datetime(self):
@@ -48,6 +79,12 @@ class Clock(System):
 class Context(Clock):
     def __init__(self, config=None):
         self._pending = defaultdict(list)
+        self._flags = {}
+        # (time, order, f) of scheduled events, i.e. planting and harvest
+        self._events = []
+        self._event_order = itertools.count()
+        # called at the end of every update, i.e. memory.Monitor
+        self._observers = []
         self.configure(config)
         super().__init__()
 
@@ -55,24 +92,66 @@ class Context(Clock):
     def context(self):
         return self
 
+    @parameter(init=None)
+    def seed(self):
+        return None
+
+    def stream(self, key):
+        from .rng import Stream, seed_sequence
+        try:
+            entropy = self.__dict__['_entropy']
+        except KeyError:
+            # fresh entropy unless seed given, shared by all streams of this context
+            entropy = self._entropy = np.random.SeedSequence(self.seed).entropy
+        return Stream(seed_sequence(entropy, key))
+
     def configure(self, config):
         if config is None:
             d = {}
         elif isinstance(config, dict):
             d = config
         else:
+            import toml
             d = toml.loads(config)
         self._config = d
+        # option lookups only probe flattened index, memoized per class until reconfigured
+        self._option_index = flatten(d)
+        self._option_memo = {}
+
+    def lookup(self, obj, *keys):
+        k = (obj.__class__,) + keys
+        try:
+            return self._option_memo[k]
+        except KeyError:
+            v = self._option_memo[k] = obj.search(obj, *keys, index=self._option_index)
+            return v
 
     def queue(self, f, priority=Priority.DEFAULT):
         if f is None:
             return
         self._pending[priority].append(f)
 
+    def schedule(self, at, f):
+        # f called at the beginning of first update reaching time at, i.e. '10 day'
+        at = U(at, self.unit)
+        heapq.heappush(self._events, (at, next(self._event_order), f))
+
+    def observe(self, f):
+        self._observers.append(f)
+
+    def fire(self):
+        E = self._events
+        t = self.time
+        while E and E[0][0] <= t:
+            heapq.heappop(E)[2]()
+
     def update(self):
         # process pending operations from last timestep (i.e. @produce)
         self.flush(post=False)
 
+        # process events scheduled by now
+        self.fire()
+
         # update state variables recursively
         super().update()
         [s.update() for s in self.collect()]
@@ -80,6 +159,12 @@ class Context(Clock):
         # process pending operations from current timestep (i.e. @flag, @accumulate)
         self.flush(post=True)
 
+        # length of next step from rates just stored
+        if self.adaptive:
+            self._step = self.control()
+
+        [f() for f in self._observers]
+
         #TODO: process aggregate (i.e. transport) operations?
 
     def flush(self, post=False):
@@ -95,9 +180,76 @@ class Context(Clock):
             for f in p:
                 f()
 
+    def control(self, safety=0.9, shrink=0.2, grow=2):
+        # Euler error of each accumulate estimated from change of its last two rates,
+        # |r1 - r0| dt / 2, and kept under tolerance of its value by scaling step
+        tol = self.tolerance
+        lo, hi = self.min_interval, self.max_interval
+        h = hi
+        flags = {}
+        changed = False
+        for s in self.collect():
+            for v, tr in s.__dict__.get('_trackable_data', {}).items():
+                if isinstance(v, flag):
+                    # restart from shortest step when any flag turned
+                    flags[tr] = tr._value
+                    changed |= (tr in self._flags and self._flags[tr] != tr._value)
+                    # land on predicted crossing of threshold
+                    if v._threshold_var is not None and not tr._value:
+                        dt = self.predict(s, *v._threshold_var)
+                        if dt is not None and dt > 0:
+                            h = min(h, dt)
+                elif isinstance(tr, Accumulate) and not isinstance(tr, Difference):
+                    if tr._regime != '' or len(tr._rates) < 2:
+                        continue
+                    (t0, r0), (t1, r1) = list(tr._rates.items())[-2:]
+                    if r0 is None or r1 is None:
+                        continue
+                    dt = t1 - t0
+                    try:
+                        e = abs(r1 - r0) * dt / 2
+                        sc = abs(tr._value) + abs(r1) * dt
+                        with np.errstate(divide='ignore', invalid='ignore'):
+                            e = float(np.max(U.magnitude(e / sc, 'dimensionless')))
+                    except (TypeError, ValueError, ZeroDivisionError):
+                        continue
+                    if not np.isfinite(e):
+                        continue
+                    f = grow if e == 0 else min(grow, max(shrink, safety * (tol / e)**0.5))
+                    h = min(h, dt * f)
+        self._flags = flags
+        if changed:
+            return lo
+        # land on next event
+        if self._events:
+            dt = self._events[0][0] - self.time
+            if dt > 0:
+                h = min(h, dt)
+        # multiple of min_interval keeping time on the grid of driver data (i.e. hourly weather)
+        n = U.magnitude(min(h, hi) / lo, 'dimensionless')
+        return max(int(np.floor(n + 1e-9)), 1) * lo
+
+    def predict(self, obj, k, x):
+        # time until accumulate k reaches x at its last rate, None if unknown
+        try:
+            v = obj._trackable[k]
+        except KeyError:
+            return None
+        tr = v.data(obj).get(v)
+        if not isinstance(tr, Accumulate) or not tr._rates:
+            return None
+        r = list(tr._rates.values())[-1]
+        try:
+            if r is None or not r > 0:
+                return None
+            return (obj[x] - tr._value) / r
+        except (TypeError, ValueError):
+            return None
+
 def instance(systemcls, config=None):
     c = Context(config)
     s = systemcls(context=c, parent=c)
+    s._seed_key = (systemcls.__name__,)
     c.children.append(s)
     c.update()
     # def f():
@@ -0,0 +1,275 @@
+from .unit import U
+
+import datetime
+import json
+import numpy as np
+import os
+import pandas as pd
+
+class Row:
+    __slots__ = ('_driver', '_offset')
+
+    def __init__(self, driver, offset):
+        self._driver = driver
+        self._offset = offset
+
+    def __repr__(self):
+        return f'<Row {self._offset}: {dict(self.items())}>'
+
+    def __getitem__(self, name):
+        return self._driver.columns[name][self._offset]
+
+    def __contains__(self, name):
+        return name in self._driver.columns
+
+    def keys(self):
+        return self._driver.columns.keys()
+
+    def items(self):
+        return ((k, self[k]) for k in self.keys())
+
+class Driver:
+    def __init__(self, index, columns, tz=None):
+        self.index = np.asarray(index)
+        self.columns = {k: np.asarray(v) for k, v in columns.items()}
+        self.tz = tz
+        self._last = (None, None)
+        self.setup()
+
+    def __repr__(self):
+        return f'<Driver {len(self)} x {list(self.columns)}>'
+
+    def __len__(self):
+        return len(self.index)
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def setup(self):
+        # regular spacing allows locating rows by arithmetic instead of searching
+        I = self.index
+        self._start = I[0] if len(I) > 0 else None
+        self._step = None
+        if len(I) > 1:
+            d = np.diff(I)
+            if (d == d[0]).all() and d[0] > d[0] * 0:
+                self._step = d[0]
+
+    @classmethod
+    def from_dataframe(cls, df):
+        index = df.index
+        tz = getattr(index, 'tz', None)
+        if isinstance(index, pd.DatetimeIndex):
+            # keep naive UTC internally, keys are converted in key()
+            if tz is not None:
+                index = index.tz_convert('UTC').tz_localize(None)
+            index = index.to_numpy().astype('datetime64[ns]')
+        else:
+            index = index.to_numpy()
+        return cls(index, {k: df[k].to_numpy() for k in df.columns}, tz=tz)
+
+    def save(self, path):
+        # one .npy file per column so that each can be memory-mapped independently
+        os.makedirs(path)
+        np.save(os.path.join(path, 'index.npy'), self.index)
+        names = list(self.columns)
+        for i, k in enumerate(names):
+            v = self.columns[k]
+            if v.dtype == object:
+                #HACK: object arrays can't be memory-mapped, store as fixed width string
+                v = v.astype(str)
+            np.save(os.path.join(path, f'{i}.npy'), v)
+        with open(os.path.join(path, 'meta.json'), 'w') as f:
+            json.dump({'columns': names, 'tz': str(self.tz) if self.tz is not None else None}, f)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        index, columns, meta = load(path, mmap)
+        return cls(index, columns, tz=meta['tz'])
+
+    def to_dataframe(self):
+        index = self.index
+        if np.issubdtype(index.dtype, np.datetime64):
+            index = pd.DatetimeIndex(index)
+            if self.tz is not None:
+                index = index.tz_localize('UTC').tz_convert(self.tz)
+        return pd.DataFrame(self.columns, index=index)
+
+    def key(self, k):
+        return to_key(k, self.tz)
+
+    def locate(self, k):
+        if k == self._last[0]:
+            return self._last[1]
+        x = self.key(k)
+        n = len(self.index)
+        i = None
+        if self._step is not None:
+            j = int(round((x - self._start) / self._step))
+            if 0 <= j < n and self.index[j] == x:
+                i = j
+        if i is None:
+            # fallback when clock and data are not aligned
+            j = int(np.searchsorted(self.index, x))
+            if j < n and self.index[j] == x:
+                i = j
+            else:
+                raise KeyError(k)
+        self._last = (k, i)
+        return i
+
+    def loc(self, k):
+        return Row(self, self.locate(k))
+
+    def delta(self, step):
+        if isinstance(step, (datetime.timedelta, pd.Timedelta)):
+            return np.timedelta64(pd.Timedelta(step).value, 'ns')
+        elif np.issubdtype(self.index.dtype, np.datetime64) and not isinstance(step, np.timedelta64):
+            # i.e. context.interval in hours
+            return np.timedelta64(int(round(U.magnitude(step, 's') * 1e9)), 'ns')
+        else:
+            return U.magnitude(step)
+
+    def span(self, step, start=None):
+        step = self.delta(step)
+        start = self.index[0] if start is None else self.key(start)
+        n = int((self.index[-1] - start) // step) + 1
+        return start + np.arange(n) * step
+
+    def resample(self, step=None, index=None, method='linear', start=None):
+        # whole series computed ahead of time so that lookups remain O(1) per step
+        X = self.span(step, start) if index is None else np.asarray([self.key(k) for k in index])
+        if isinstance(method, dict):
+            M, default = method, 'linear'
+        else:
+            M, default = {}, method
+        columns = {k: self._resample(v, X, M.get(k, default)) for k, v in self.columns.items()}
+        return Driver(X, columns, tz=self.tz)
+
+    def _resample(self, v, X, method):
+        numeric = lambda a: a.astype('int64').astype(float) if np.issubdtype(a.dtype, np.datetime64) else a.astype(float)
+        x = numeric(self.index)
+        X = numeric(X)
+        n = len(x)
+        if not np.issubdtype(v.dtype, np.number):
+            # non-numeric columns (i.e. time string) are only held
+            method = 'first' if method in AGGREGATES else 'step'
+        if method == 'step':
+            i = np.clip(np.searchsorted(x, X, side='right') - 1, 0, n-1)
+            return v[i]
+        elif method == 'linear':
+            return np.interp(X, x, v)
+        elif method == 'spline':
+            import scipy.interpolate
+            return scipy.interpolate.CubicSpline(x, v)(X)
+        elif method in AGGREGATES:
+            # aggregate source rows falling in [X[i], X[i+1])
+            E = np.append(X, X[-1] + (X[-1] - X[-2] if len(X) > 1 else np.inf))
+            I = np.searchsorted(x, E, side='left')
+            lo, hi = I[:-1], I[1:]
+            empty = (lo == hi)
+            if method == 'first':
+                return v[np.clip(lo, 0, n-1)]
+            v = v.astype(float)
+            if method in ('sum', 'mean'):
+                c = np.concatenate([[0], np.cumsum(v)])
+                r = c[hi] - c[lo]
+                if method == 'mean':
+                    with np.errstate(invalid='ignore', divide='ignore'):
+                        r = r / (hi - lo)
+            else:
+                f = {'min': np.minimum, 'max': np.maximum}[method]
+                w = np.append(v, v[-1])
+                r = f.reduceat(w, np.column_stack([lo, hi]).ravel())[::2]
+            r[empty] = np.nan
+            return r
+        else:
+            raise ValueError(f'unknown resampling method: {method}')
+
+AGGREGATES = ('first', 'sum', 'mean', 'min', 'max')
+
+def to_key(k, tz=None):
+    if isinstance(k, (datetime.datetime, np.datetime64, pd.Timestamp)):
+        k = pd.Timestamp(k)
+        if k.tzinfo is None:
+            #HACK: naive datetime is assumed to be in the timezone of data
+            if tz is not None:
+                k = k.tz_localize(tz)
+        if k.tzinfo is not None:
+            k = k.tz_convert('UTC').tz_localize(None)
+        return np.datetime64(k.value, 'ns')
+    else:
+        return U.magnitude(k)
+
+def load(path, mmap=True):
+    # read-only mapping lets all processes on a node share the same physical pages
+    mode = 'r' if mmap else None
+    with open(os.path.join(path, 'meta.json')) as f:
+        meta = json.load(f)
+    index = np.load(os.path.join(path, 'index.npy'), mmap_mode=mode)
+    columns = {k: np.load(os.path.join(path, f'{i}.npy'), mmap_mode=mode) for i, k in enumerate(meta['columns'])}
+    return index, columns, meta
+
+class Archive:
+    # rows of each site are stored contiguously in one column store, sorted by time
+    def __init__(self, path, mmap=True):
+        self.index, self.columns, meta = load(path, mmap)
+        self.tz = meta['tz']
+        #HACK: JSON turns tuple keys (i.e. (lat, lon)) into lists
+        self._sites = {tuple(s) if isinstance(s, list) else s: (b, e) for s, b, e in meta['sites']}
+
+    def __repr__(self):
+        return f'<Archive {len(self._sites)} sites x {list(self.columns)}>'
+
+    def __len__(self):
+        return len(self._sites)
+
+    def __contains__(self, site):
+        return site in self._sites
+
+    def __getitem__(self, site):
+        return self.select(site)
+
+    @property
+    def sites(self):
+        return list(self._sites)
+
+    @classmethod
+    def build(cls, path, data):
+        # data: {site: Driver or DataFrame}
+        D = {s: d if isinstance(d, Driver) else Driver.from_dataframe(d) for s, d in data.items()}
+        names = None
+        sites = []
+        n = 0
+        for s, d in D.items():
+            if names is None:
+                names = list(d.columns)
+            elif list(d.columns) != names:
+                raise ValueError(f'columns of site {s!r} differ: {list(d.columns)} != {names}')
+            sites.append([s, n, n + len(d)])
+            n += len(d)
+        tz = {str(d.tz) if d.tz is not None else None for d in D.values()}
+        if len(tz) > 1:
+            raise ValueError(f'sites have different timezones: {tz}')
+        index = np.concatenate([d.index for d in D.values()])
+        columns = {k: np.concatenate([d.columns[k] for d in D.values()]) for k in names}
+        Driver(index, columns, tz=D[sites[0][0]].tz if sites else None).save(path)
+        meta_path = os.path.join(path, 'meta.json')
+        with open(meta_path) as f:
+            meta = json.load(f)
+        meta['sites'] = sites
+        with open(meta_path, 'w') as f:
+            json.dump(meta, f)
+        return cls(path)
+
+    def select(self, site, start=None, end=None):
+        b, e = self._sites[site]
+        if start is not None or end is not None:
+            # slice by time with binary search within the site
+            I = self.index[b:e]
+            if start is not None:
+                b = b + int(np.searchsorted(I, to_key(start, self.tz), side='left'))
+                I = self.index[b:e]
+            if end is not None:
+                e = b + int(np.searchsorted(I, to_key(end, self.tz), side='right'))
+        return Driver(self.index[b:e], {k: v[b:e] for k, v in self.columns.items()}, tz=self.tz)
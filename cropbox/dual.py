@@ -0,0 +1,175 @@
+from .unit import U
+
+import numpy as np
+import operator
+
+# Forward-mode automatic differentiation with dual numbers carrying gradients to seeded parameters.
+# Model code should use numpy functions (i.e. np.exp) rather than math module which drops gradients.
+
+class Dual:
+    # make numpy defer binary operations to us
+    __array_priority__ = 1000
+
+    def __init__(self, value, grad):
+        self.value = value
+        self.grad = np.asarray(grad, dtype=float)
+
+    def __repr__(self):
+        return f'Dual({self.value}, {self.grad})'
+
+    def __float__(self):
+        return float(self.value)
+
+    def __int__(self):
+        return int(self.value)
+
+    def __bool__(self):
+        return bool(self.value)
+
+    def __hash__(self):
+        return hash(self.value)
+
+    def __eq__(self, other):
+        return self.value == value(other)
+
+    def __ne__(self, other):
+        return self.value != value(other)
+
+    def __lt__(self, other):
+        return self.value < value(other)
+
+    def __le__(self, other):
+        return self.value <= value(other)
+
+    def __gt__(self, other):
+        return self.value > value(other)
+
+    def __ge__(self, other):
+        return self.value >= value(other)
+
+    def __neg__(self):
+        return Dual(-self.value, -self.grad)
+
+    def __pos__(self):
+        return self
+
+    def __abs__(self):
+        return Dual(abs(self.value), np.sign(self.value) * self.grad)
+
+    def __add__(self, other):
+        a, ga = _lift(other)
+        return Dual(self.value + a, self.grad + ga)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        a, ga = _lift(other)
+        return Dual(self.value - a, self.grad - ga)
+
+    def __rsub__(self, other):
+        a, ga = _lift(other)
+        return Dual(a - self.value, ga - self.grad)
+
+    def __mul__(self, other):
+        a, ga = _lift(other)
+        return Dual(self.value * a, self.grad * a + self.value * ga)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        a, ga = _lift(other)
+        return Dual(self.value / a, (self.grad * a - self.value * ga) / a**2)
+
+    def __rtruediv__(self, other):
+        a, ga = _lift(other)
+        return Dual(a / self.value, (ga * self.value - a * self.grad) / self.value**2)
+
+    def __pow__(self, other):
+        if isinstance(other, Dual):
+            v = self.value ** other.value
+            return Dual(v, v * (other.grad * np.log(self.value) + other.value * self.grad / self.value))
+        else:
+            return Dual(self.value ** other, other * self.value ** (other - 1) * self.grad)
+
+    def __rpow__(self, other):
+        v = other ** self.value
+        return Dual(v, v * np.log(other) * self.grad)
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        if method != '__call__' or kwargs or any(isinstance(x, np.ndarray) and x.ndim > 0 for x in inputs):
+            return NotImplemented
+        # avoid numpy scalars (or 0-d arrays) dispatching back here
+        inputs = [x.item() if isinstance(x, (np.generic, np.ndarray)) else x for x in inputs]
+        try:
+            return _BINARY[ufunc](*inputs)
+        except KeyError:
+            pass
+        try:
+            f, df = _UNARY[ufunc]
+        except KeyError:
+            return NotImplemented
+        x, = inputs
+        return Dual(f(x.value), df(x.value) * x.grad)
+
+def _lift(x):
+    if isinstance(x, Dual):
+        return x.value, x.grad
+    else:
+        return x, 0
+
+_BINARY = {
+    np.add: operator.add,
+    np.subtract: operator.sub,
+    np.multiply: operator.mul,
+    np.true_divide: operator.truediv,
+    np.power: operator.pow,
+    np.maximum: lambda a, b: a if a >= b else b,
+    np.minimum: lambda a, b: a if a <= b else b,
+    np.greater: operator.gt,
+    np.greater_equal: operator.ge,
+    np.less: operator.lt,
+    np.less_equal: operator.le,
+    np.equal: operator.eq,
+    np.not_equal: operator.ne,
+}
+
+_UNARY = {
+    np.negative: (np.negative, lambda x: -1),
+    np.absolute: (np.absolute, np.sign),
+    np.square: (np.square, lambda x: 2*x),
+    np.sqrt: (np.sqrt, lambda x: 0.5 / np.sqrt(x)),
+    np.exp: (np.exp, np.exp),
+    np.log: (np.log, lambda x: 1 / x),
+    np.log10: (np.log10, lambda x: 1 / (x * np.log(10))),
+    np.sin: (np.sin, np.cos),
+    np.cos: (np.cos, lambda x: -np.sin(x)),
+    np.tan: (np.tan, lambda x: 1 / np.cos(x)**2),
+    np.tanh: (np.tanh, lambda x: 1 - np.tanh(x)**2),
+    np.arctan: (np.arctan, lambda x: 1 / (1 + x**2)),
+    np.arcsin: (np.arcsin, lambda x: 1 / np.sqrt(1 - x**2)),
+    np.arccos: (np.arccos, lambda x: -1 / np.sqrt(1 - x**2)),
+}
+
+def value(x):
+    if isinstance(x, U.registry.Quantity):
+        return U(value(x.magnitude), x.units)
+    return x.value if isinstance(x, Dual) else x
+
+def gradient(x, n):
+    # gradient of x (in units of x) with respect to n seeded parameters
+    x = U.magnitude(x)
+    return x.grad if isinstance(x, Dual) else np.zeros(n)
+
+def seed(config, params):
+    # params: {'Section.name': value} to be differentiated against in the order given
+    # returns a copy of config with those values replaced by dual numbers
+    config = {k: dict(v) if isinstance(v, dict) else v for k, v in (config or {}).items()}
+    E = np.eye(len(params))
+    for e, (k, v) in zip(E, params.items()):
+        s, n = k.split('.')
+        if isinstance(v, U.registry.Quantity):
+            d = U(Dual(v.magnitude, e), v.units)
+        else:
+            d = Dual(v, e)
+        config.setdefault(s, {})[n] = d
+    return config
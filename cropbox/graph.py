@@ -1,8 +1,5 @@
-import ast
-from astpretty import pprint
 from functools import reduce
 import inspect
-import networkx as nx
 import re
 import textwrap
 
@@ -11,6 +8,9 @@ from .unit import U
 from .logger import logger
 
 def collect(root):
+    # networkx and ast are only needed for inspecting models
+    import ast
+    import networkx as nx
     g = nx.DiGraph()
     c = root.context
     g.graph = {
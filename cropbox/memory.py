@@ -0,0 +1,91 @@
+from .system import System
+from .track import Track
+
+import sys
+import types
+
+# Memory held by a running model, attributed to System classes, statevar tracks and pending queues.
+# Sizes are deep but do not cross into other Systems or Tracks which are accounted on their own.
+
+SKIP = (type, types.ModuleType, types.FunctionType, types.MethodType, types.BuiltinFunctionType, types.CodeType)
+
+class Meter:
+    def __init__(self, stop=(System, Track)):
+        self.stop = stop
+        self.seen = set()
+
+    def measure(self, o):
+        # (bytes, objects) reachable from o not measured before
+        n = c = 0
+        Q = [(o, True)]
+        while Q:
+            o, root = Q.pop()
+            if id(o) in self.seen:
+                continue
+            if not root and isinstance(o, self.stop + SKIP):
+                continue
+            self.seen.add(id(o))
+            n += sys.getsizeof(o, 0)
+            c += 1
+            if isinstance(o, dict):
+                Q.extend((x, False) for kv in o.items() for x in kv)
+            elif isinstance(o, (list, tuple, set, frozenset)):
+                Q.extend((x, False) for x in o)
+            elif isinstance(o, types.FunctionType):
+                # pending operations are closures
+                Q.extend((cell.cell_contents, False) for cell in o.__closure__ or () if cell.cell_contents is not None)
+            d = getattr(o, '__dict__', None)
+            if isinstance(d, dict):
+                Q.append((d, False))
+            for k in getattr(type(o), '__slots__', ()):
+                try:
+                    Q.append((getattr(o, k), False))
+                except AttributeError:
+                    pass
+        return n, c
+
+def sizeof(o):
+    return Meter().measure(o)[0]
+
+def account(root):
+    # bytes and objects per System class, per (System class, statevar) track, and per priority of pending queue
+    import pandas as pd
+    c = root.context
+    m = Meter()
+    R = {}
+    def add(kind, system, variable, n, count):
+        r = R.setdefault((kind, system, variable), [0, 0, 0])
+        r[0] += 1
+        r[1] += n
+        r[2] += count
+    for s in c.collect(exclude_self=False):
+        name = s.__class__.__name__
+        n, count = m.measure(s)
+        add('system', name, '', n, count)
+        for v, tr in s.__dict__.get('_trackable_data', {}).items():
+            if isinstance(tr, Track):
+                add('track', name, v.__name__, *m.measure(tr))
+    for p, Q in c._pending.items():
+        for f in Q:
+            add('pending', 'Context', str(int(p)), *m.measure(f))
+    index = pd.MultiIndex.from_tuples(list(R), names=['kind', 'system', 'variable'])
+    return pd.DataFrame(list(R.values()), index=index, columns=['count', 'bytes', 'objects'])
+
+class Monitor:
+    # samples account() every n ticks during a run, after each update of context
+    def __init__(self, root, every=1):
+        self.root = root
+        self.every = every
+        self.samples = {}
+        root.context.observe(self.sample)
+
+    def sample(self):
+        t = self.root.context.tick
+        if t % self.every == 0:
+            self.samples[t] = account(self.root)
+
+    def series(self, level='system', column='bytes'):
+        # time series of column summed by index level, i.e. bytes per System class over ticks
+        import pandas as pd
+        df = pd.concat(self.samples, names=['tick'])
+        return df.groupby(['tick', level])[column].sum().unstack(fill_value=0)
@@ -0,0 +1,79 @@
+from collections import Counter, defaultdict
+import contextlib
+import time
+
+class Stat:
+    __slots__ = ('calls', 'computes', 'forced', 'inclusive', 'exclusive')
+
+    def __init__(self):
+        self.calls = 0
+        self.computes = 0
+        # computed due to regime change (i.e. iterations of @optimize) rather than a new time
+        self.forced = 0
+        self.inclusive = 0.
+        self.exclusive = 0.
+
+    @property
+    def hits(self):
+        return self.calls - self.computes
+
+class Profiler:
+    # statistics per (System class, variable) collected from Trace frames
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.stats = defaultdict(Stat)
+        # exclusive time of each stack of frames for flame graphs
+        self.stacks = Counter()
+        self._frames = []
+        self._active = Counter()
+
+    def enter(self, var, obj):
+        k = (obj.__class__.__name__, var.__name__)
+        self._active[k] += 1
+        self._frames.append([k, self.clock(), 0.])
+
+    def exit(self):
+        k, t, child = self._frames.pop()
+        elapsed = self.clock() - t
+        s = self.stats[k]
+        self._active[k] -= 1
+        # recursive frames of the same variable are only counted once in inclusive time
+        if self._active[k] == 0:
+            s.inclusive += elapsed
+        s.exclusive += elapsed - child
+        if self._frames:
+            self._frames[-1][2] += elapsed
+        self.stacks[tuple(f[0] for f in self._frames) + (k,)] += elapsed - child
+
+    def record(self, var, obj, computed, forced):
+        s = self.stats[(obj.__class__.__name__, var.__name__)]
+        s.calls += 1
+        s.computes += computed
+        s.forced += forced
+
+    def table(self):
+        import pandas as pd
+        columns = ['calls', 'computes', 'hits', 'forced', 'inclusive', 'exclusive']
+        rows = [[getattr(s, c) for c in columns] for s in self.stats.values()]
+        index = pd.MultiIndex.from_tuples(list(self.stats), names=['system', 'variable'])
+        return pd.DataFrame(rows, index=index, columns=columns).sort_values('exclusive', ascending=False)
+
+    def folded(self, filename=None):
+        # stack dump in the folded format of flamegraph.pl / speedscope, weighted by microseconds
+        lines = [';'.join(f'{s}.{v}' for s, v in k) + f' {round(t * 1e6)}' for k, t in self.stacks.items()]
+        text = '\n'.join(lines) + '\n'
+        if filename is not None:
+            with open(filename, 'w') as f:
+                f.write(text)
+        return text
+
+@contextlib.contextmanager
+def profile(profiler=None):
+    from .statevar import statevar
+    p = Profiler() if profiler is None else profiler
+    trace = statevar.trace
+    q, trace.profiler = trace.profiler, p
+    try:
+        yield p
+    finally:
+        trace.profiler = q
@@ -0,0 +1,37 @@
+import numpy as np
+import zlib
+
+# Random streams of each System derived from context seed and its path of creation,
+# so draws are reproducible regardless of update order or worker process.
+
+def seed_sequence(entropy, key):
+    # names in key are hashed with crc32 as hash() of str is salted per process
+    spawn_key = tuple(k if isinstance(k, int) else zlib.crc32(str(k).encode()) for k in key)
+    return np.random.SeedSequence(entropy, spawn_key=spawn_key)
+
+class Stream:
+    # draws are generated in blocks so that scalar draws from many flags share vectorized calls
+    def __init__(self, seed, size=64):
+        self.generator = np.random.Generator(np.random.PCG64(seed))
+        self.size = size
+        self._uniform = self._normal = ()
+        self._i = self._j = 0
+
+    def random(self):
+        if self._i >= len(self._uniform):
+            self._uniform = self.generator.random(self.size)
+            self._i = 0
+        x = float(self._uniform[self._i])
+        self._i += 1
+        return x
+
+    def uniform(self, low=0., high=1.):
+        return low + (high - low) * self.random()
+
+    def normal(self, loc=0., scale=1.):
+        if self._j >= len(self._normal):
+            self._normal = self.generator.standard_normal(self.size)
+            self._j = 0
+        x = float(self._normal[self._j])
+        self._j += 1
+        return loc + scale * x
@@ -0,0 +1,40 @@
+from .context import instance
+from .unit import U
+
+from concurrent.futures import ProcessPoolExecutor
+import contextlib
+import pandas as pd
+
+def configure(config, params):
+    # params: {'Section.name': value} merged into a copy of config
+    config = {k: dict(v) if isinstance(v, dict) else v for k, v in (config or {}).items()}
+    for k, v in params.items():
+        s, n = k.split('.')
+        config.setdefault(s, {})[n] = v
+    return config
+
+def run(systemcls, config=None, steps=1, outputs=(), cache=False):
+    # outputs recorded at initial state and after each step, indexed by context time
+    if cache:
+        from .cache import run as lookup
+        return lookup(lambda: run(systemcls, config, steps, outputs), systemcls, config, steps, outputs)
+    s = instance(systemcls, config)
+    c = s.context
+    def record():
+        return [U.magnitude(s[k]) for k in outputs]
+    index, rows = [U.magnitude(c.time)], [record()]
+    for _ in range(steps):
+        c.advance()
+        index.append(U.magnitude(c.time))
+        rows.append(record())
+    return pd.DataFrame(rows, index=pd.Index(index, name='time'), columns=list(outputs))
+
+@contextlib.contextmanager
+def executor(workers=None):
+    # map-like function evaluating in worker processes, or serially if workers == 1
+    # systemcls and functions mapped over must be picklable (i.e. defined at module level)
+    if workers == 1:
+        yield lambda f, X: [f(x) for x in X]
+    else:
+        with ProcessPoolExecutor(workers) as e:
+            yield lambda f, X: list(e.map(f, X))
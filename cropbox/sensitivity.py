@@ -0,0 +1,116 @@
+from .run import configure, executor, run
+
+import numpy as np
+import pandas as pd
+import scipy.stats
+
+# Global sensitivity analysis over params: {'Section.name': (lower, upper)} overriding config.
+# Designs are generated and evaluated in chunks while only running sums are kept, so memory doesn't grow with samples.
+# Confidence intervals come from Poisson bootstrap, i.e. each sample gets Poisson(1) weights per replicate.
+
+class Response:
+    # picklable response of outputs to a parameter vector for evaluation in worker processes
+    def __init__(self, systemcls, names, outputs, config, steps, summary):
+        self.systemcls = systemcls
+        self.names = names
+        self.outputs = outputs
+        self.config = config
+        self.steps = steps
+        self.summary = summary
+
+    def __call__(self, x):
+        config = configure(self.config, dict(zip(self.names, x)))
+        df = run(self.systemcls, config, self.steps, self.outputs)
+        # outputs at the last step unless summarized otherwise
+        y = df.iloc[-1] if self.summary is None else self.summary(df)
+        return np.asarray(y, dtype=float)
+
+def _weights(rng, bootstrap, m):
+    # first row with unit weights for the estimate itself, followed by bootstrap replicates
+    return np.vstack([np.ones(m), rng.poisson(1, (bootstrap, m))])
+
+def _frame(outputs, names, **columns):
+    # columns of (d, k) arrays to long format indexed by (output, parameter)
+    index = pd.MultiIndex.from_product([outputs, names], names=['output', 'parameter'])
+    return pd.DataFrame({c: np.asarray(v).T.ravel() for c, v in columns.items()}, index=index)
+
+def _interval(E, confidence):
+    a = (1 - confidence) / 2
+    return np.nanquantile(E[1:], a, axis=0), np.nanquantile(E[1:], 1 - a, axis=0)
+
+def morris(systemcls, params, outputs, steps, trajectories=20, levels=4, chunk=10, bootstrap=200, confidence=0.95, config=None, summary=None, workers=1, seed=None):
+    # elementary effects screening (Morris 1991) in unit scale of each parameter
+    names = list(params)
+    L, H = np.array([params[k] for k in names], dtype=float).T
+    d, k = len(names), len(outputs)
+    rng = np.random.default_rng(seed)
+    f = Response(systemcls, names, list(outputs), config, steps, summary)
+    delta = levels / (2 * (levels - 1))
+    grid = np.arange(levels) / (levels - 1)
+    def trajectory():
+        x = rng.choice(grid, d)
+        X, J, D = [x.copy()], rng.permutation(d), []
+        for j in J:
+            s = delta if x[j] + delta <= 1 else -delta
+            x[j] += s
+            X.append(x.copy())
+            D.append(s)
+        return np.array(X), J, np.array(D)
+    W = np.zeros(bootstrap + 1)
+    S1, S2, SA = np.zeros((3, bootstrap + 1, d, k))
+    with executor(workers) as map:
+        for c in range(0, trajectories, chunk):
+            T = [trajectory() for _ in range(min(chunk, trajectories - c))]
+            X = np.concatenate([X for X, _, _ in T])
+            Y = np.array(map(f, list(L + X * (H - L)))).reshape(len(T), d + 1, k)
+            EE = np.zeros((len(T), d, k))
+            for i, (_, J, D) in enumerate(T):
+                EE[i, J] = np.diff(Y[i], axis=0) / D[:, None]
+            w = _weights(rng, bootstrap, len(T))
+            W += w.sum(axis=1)
+            S1 += np.einsum('bt,tdk->bdk', w, EE)
+            S2 += np.einsum('bt,tdk->bdk', w, EE**2)
+            SA += np.einsum('bt,tdk->bdk', w, np.abs(EE))
+    n = W[:, None, None]
+    mu, mu_star = S1 / n, SA / n
+    with np.errstate(invalid='ignore', divide='ignore'):
+        sigma = np.sqrt(np.maximum(S2 - S1**2 / n, 0) / (n - 1))
+    lo, hi = _interval(mu_star, confidence)
+    return _frame(outputs, names, mu=mu[0], mu_star=mu_star[0], sigma=sigma[0], mu_star_lo=lo, mu_star_hi=hi)
+
+def sobol(systemcls, params, outputs, steps, n=1024, chunk=256, bootstrap=200, confidence=0.95, config=None, summary=None, workers=1, seed=None):
+    # first-order (Saltelli 2010) and total (Jansen 1999) indices from n base samples, costing n(d+2) runs
+    names = list(params)
+    L, H = np.array([params[k] for k in names], dtype=float).T
+    d, k = len(names), len(outputs)
+    rng = np.random.default_rng(seed)
+    sampler = scipy.stats.qmc.Sobol(2*d, scramble=True, seed=rng)
+    f = Response(systemcls, names, list(outputs), config, steps, summary)
+    N = np.zeros(bootstrap + 1)
+    SY, SYY = np.zeros((2, bootstrap + 1, k))
+    V1, VT = np.zeros((2, bootstrap + 1, d, k))
+    with executor(workers) as map:
+        for c in range(0, n, chunk):
+            m = min(chunk, n - c)
+            AB = sampler.random(m)
+            A, B = AB[:, :d], AB[:, d:]
+            # A with i-th column taken from B
+            ABi = np.repeat(A[None], d, axis=0)
+            ABi[np.arange(d), :, np.arange(d)] = B.T
+            X = np.concatenate([A, B, ABi.reshape(-1, d)])
+            Y = np.array(map(f, list(L + X * (H - L))))
+            fA, fB, fABi = Y[:m], Y[m:2*m], Y[2*m:].reshape(d, m, k)
+            w = _weights(rng, bootstrap, m)
+            N += w.sum(axis=1)
+            SY += w @ fA + w @ fB
+            SYY += w @ fA**2 + w @ fB**2
+            V1 += np.einsum('bm,dmk->bdk', w, fB[None] * (fABi - fA[None]))
+            VT += np.einsum('bm,dmk->bdk', w, (fA[None] - fABi)**2)
+    n2 = 2 * N[:, None]
+    V = (SYY / n2 - (SY / n2)**2)[:, None, :]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        S1 = V1 / N[:, None, None] / V
+        ST = VT / n2[:, None] / V
+    S1_lo, S1_hi = _interval(S1, confidence)
+    ST_lo, ST_hi = _interval(ST, confidence)
+    return _frame(outputs, names, S1=S1[0], S1_lo=S1_lo, S1_hi=S1_hi, ST=ST[0], ST_lo=ST_lo, ST_hi=ST_hi)
@@ -0,0 +1,147 @@
+import numpy as np
+
+# Vectorized 1-D root finders where each lane converges independently.
+# f(x, i) evaluates lanes i (indices into the original arrays) at x, returning an array.
+
+def _evaluate(f, x, i):
+    return np.asarray(f(x, i), dtype=float)
+
+def _bracket(f, a, b, fa, fb):
+    a = np.array(a, dtype=float)
+    b = np.array(b, dtype=float)
+    I = np.arange(len(a))
+    fa = _evaluate(f, a, I) if fa is None else np.array(fa, dtype=float)
+    fb = _evaluate(f, b, I) if fb is None else np.array(fb, dtype=float)
+    return a, b, fa, fb
+
+def bisect(f, a, b, fa=None, fb=None, xtol=2e-12, rtol=4*np.finfo(float).eps, maxiter=100):
+    a, b, fa, fb = _bracket(f, a, b, fa, fb)
+    x = np.where(fa == 0, a, np.where(fb == 0, b, np.nan))
+    active = np.isnan(x) & (np.sign(fa) != np.sign(fb))
+    for _ in range(maxiter):
+        I = np.flatnonzero(active)
+        if len(I) == 0:
+            break
+        m = (a[I] + b[I]) / 2
+        fm = _evaluate(f, m, I)
+        left = np.sign(fm) == np.sign(fa[I])
+        a[I] = np.where(left, m, a[I])
+        fa[I] = np.where(left, fm, fa[I])
+        b[I] = np.where(left, b[I], m)
+        done = (fm == 0) | (np.abs(b[I] - a[I]) < xtol + rtol*np.abs(m))
+        x[I[done]] = m[done]
+        active[I[done]] = False
+    return x
+
+def chandrupatla(f, a, b, fa=None, fb=None, xtol=2e-12, rtol=4*np.finfo(float).eps, maxiter=100):
+    # bracketing method with inverse quadratic interpolation, comparable to Brent's but branch-free per lane
+    # Chandrupatla (1997), Adv Eng Softw 28:145-149
+    a, b, fa, fb = _bracket(f, a, b, fa, fb)
+    x = np.where(fa == 0, a, np.where(fb == 0, b, np.nan))
+    active = np.isnan(x) & (np.sign(fa) != np.sign(fb))
+    c, fc = a.copy(), fa.copy()
+    t = np.full(len(a), 0.5)
+    for _ in range(maxiter):
+        I = np.flatnonzero(active)
+        if len(I) == 0:
+            break
+        xt = a[I] + t[I] * (b[I] - a[I])
+        ft = _evaluate(f, xt, I)
+        same = np.sign(ft) == np.sign(fa[I])
+        c[I] = np.where(same, a[I], b[I])
+        fc[I] = np.where(same, fa[I], fb[I])
+        b[I] = np.where(same, b[I], a[I])
+        fb[I] = np.where(same, fb[I], fa[I])
+        a[I], fa[I] = xt, ft
+        small = np.abs(fa[I]) < np.abs(fb[I])
+        xm = np.where(small, a[I], b[I])
+        fm = np.where(small, fa[I], fb[I])
+        tol = 2*rtol*np.abs(xm) + xtol/2
+        with np.errstate(divide='ignore', invalid='ignore'):
+            tl = tol / np.abs(b[I] - c[I])
+            done = (fm == 0) | (tl > 0.5)
+            x[I[done]] = xm[done]
+            active[I[done]] = False
+            xi = (a[I] - b[I]) / (c[I] - b[I])
+            phi = (fa[I] - fb[I]) / (fc[I] - fb[I])
+            iqi = (phi**2 < xi) & ((1 - phi)**2 < 1 - xi)
+            ti = fa[I] / (fb[I] - fa[I]) * fc[I] / (fb[I] - fc[I]) \
+               + (c[I] - a[I]) / (b[I] - a[I]) * fa[I] / (fc[I] - fa[I]) * fb[I] / (fc[I] - fb[I])
+        t[I] = np.clip(np.where(iqi, ti, 0.5), tl, 1 - tl)
+    return x
+
+def secant(f, x0, x1, f0=None, xtol=2e-12, rtol=4*np.finfo(float).eps, maxiter=50):
+    # unconverged lanes are left as nan, callers may fall back to a bracketing method
+    x0 = np.array(x0, dtype=float)
+    x1 = np.array(x1, dtype=float)
+    I = np.arange(len(x0))
+    f0 = _evaluate(f, x0, I) if f0 is None else np.array(f0, dtype=float)
+    f1 = _evaluate(f, x1, I)
+    x = np.where(f1 == 0, x1, np.nan)
+    active = np.isnan(x)
+    for _ in range(maxiter):
+        I = np.flatnonzero(active)
+        if len(I) == 0:
+            break
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x2 = x1[I] - f1[I] * (x1[I] - x0[I]) / (f1[I] - f0[I])
+        bad = ~np.isfinite(x2)
+        active[I[bad]] = False
+        I, x2 = I[~bad], x2[~bad]
+        if len(I) == 0:
+            break
+        f2 = _evaluate(f, x2, I)
+        done = (f2 == 0) | (np.abs(x2 - x1[I]) < xtol + rtol*np.abs(x2))
+        x0[I], f0[I] = x1[I], f1[I]
+        x1[I], f1[I] = x2, f2
+        x[I[done]] = x2[done]
+        active[I[done]] = False
+    return x
+
+# Multivariate solvers for x = g(x) written as residual f(x) = g(x) - x.
+# Both return (x, converged) so callers may chain a fallback.
+
+def jacobian(f, x, fx, h=1e-6):
+    n = len(x)
+    J = np.empty((len(fx), n))
+    for j in range(n):
+        dx = h * max(1, abs(x[j]))
+        xj = x.copy()
+        xj[j] += dx
+        J[:, j] = (f(xj) - fx) / dx
+    return J
+
+def broyden(f, x0, tol=1e-8, maxiter=50):
+    # Newton step with finite difference Jacobian, then Broyden's rank-one updates
+    x = np.array(x0, dtype=float)
+    fx = np.asarray(f(x), dtype=float)
+    if np.max(np.abs(fx)) < tol:
+        return x, True
+    J = jacobian(f, x, fx)
+    for _ in range(maxiter):
+        try:
+            dx = -np.linalg.solve(J, fx)
+        except np.linalg.LinAlgError:
+            return x, False
+        if not np.isfinite(dx).all():
+            return x, False
+        x = x + dx
+        fx1 = np.asarray(f(x), dtype=float)
+        if not np.isfinite(fx1).all():
+            return x, False
+        if np.max(np.abs(fx1)) < tol:
+            return x, True
+        df = fx1 - fx
+        J += np.outer(df - J @ dx, dx) / (dx @ dx)
+        fx = fx1
+    return x, False
+
+def relax(f, x0, damping=0.5, tol=1e-8, maxiter=200):
+    # damped fixed-point iteration, slow but robust when g is a contraction
+    x = np.array(x0, dtype=float)
+    for _ in range(maxiter):
+        fx = np.asarray(f(x), dtype=float)
+        if np.max(np.abs(fx)) < tol:
+            return x, True
+        x = x + damping * fx
+    return x, False
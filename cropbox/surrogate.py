@@ -0,0 +1,96 @@
+from .trace import Scope
+from .track import Track
+from .unit import U
+from .logger import logger
+
+import itertools
+import numpy as np
+
+class Table:
+    # regular grid of precomputed values with multilinear interpolation
+    def __init__(self, axes, values, error=None):
+        self.axes = [np.asarray(a, dtype=float) for a in axes]
+        self.values = np.asarray(values, dtype=float)
+        # max. absolute error against exact evaluation at random points, if measured
+        self.error = error
+
+    def __repr__(self):
+        return f'<Table {self.values.shape} error = {self.error}>'
+
+    def contains(self, *X):
+        X = [np.asarray(x, dtype=float) for x in X]
+        return np.logical_and.reduce([(a[0] <= x) & (x <= a[-1]) for a, x in zip(self.axes, X)])
+
+    def __call__(self, *X):
+        # vectorized over broadcast inputs
+        X = np.broadcast_arrays(*[np.asarray(x, dtype=float) for x in X])
+        I, W = [], []
+        for a, x in zip(self.axes, X):
+            i = np.clip(np.searchsorted(a, x, side='right') - 1, 0, len(a) - 2)
+            I.append(i)
+            W.append((x - a[i]) / (a[i+1] - a[i]))
+        v = 0
+        for corner in itertools.product((0, 1), repeat=len(self.axes)):
+            w = np.prod([t if c else 1 - t for t, c in zip(W, corner)], axis=0)
+            v = v + w * self.values[tuple(i + c for i, c in zip(I, corner))]
+        return v
+
+    def save(self, path):
+        axes = {f'axis:{i}': a for i, a in enumerate(self.axes)}
+        error = np.nan if self.error is None else self.error
+        with open(path, 'wb') as f:
+            np.savez(f, values=self.values, error=error, **axes)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as z:
+            values = z['values']
+            axes = [z[f'axis:{i}'] for i in range(values.ndim)]
+            error = float(z['error'])
+        return cls(axes, values, error=None if np.isnan(error) else error)
+
+def evaluator(var, obj, inputs, f, depth=None):
+    # input tracks are pinned to given values while f is evaluated under a separate regime
+    V = [obj._trackable[k] for k in inputs]
+    T = [v.data(obj)[v] for v in V]
+    units = [U[obj[k]] for k in inputs]
+    times = [v.time(obj) for v in V]
+    scope = Scope(*T, name=f'surrogate-{obj.__class__.__name__}-{var.__name__}', depth=depth)
+    def evaluate(X):
+        with var.trace.evaluate(scope) as regime:
+            with var.trace(var, obj, regime=regime):
+                for tr, t, u, x in zip(T, times, units, X):
+                    tr.check(t, regime)
+                    tr._value = U(x, u)
+                return f()
+    return evaluate, scope
+
+def dependencies(var, obj, inputs, f):
+    # names of other variables of obj read by f, i.e. parameters, which a table depends on
+    # reads right under the frame of var, not those made by other variables (i.e. time)
+    evaluate, scope = evaluator(var, obj, inputs, f, depth=2)
+    evaluate([U.magnitude(obj[k]) for k in inputs])
+    names = {tr: v.__name__ for v, tr in obj.__dict__.get('_trackable_data', {}).items() if isinstance(tr, Track)}
+    D = set()
+    for tr in scope.reads - scope.dependents:
+        try:
+            D.add(names[tr])
+        except KeyError:
+            raise ValueError(f'@surrogate: {var!r} @ {obj} depends on {tr!r} of other System not declared in inputs') from None
+    return sorted(D)
+
+def tabulate(var, obj, inputs, f, check=20, seed=0):
+    # inputs: {name: (lower, upper, n)} of variables in obj, f: exact evaluation returning magnitude
+    axes = [np.linspace(*inputs[k]) for k in inputs]
+    evaluate, _ = evaluator(var, obj, inputs, f)
+    values = np.empty([len(a) for a in axes])
+    for i in itertools.product(*[range(len(a)) for a in axes]):
+        values[i] = evaluate([a[j] for a, j in zip(axes, i)])
+    table = Table(axes, values)
+    if check > 0:
+        rng = np.random.default_rng(seed)
+        P = [rng.uniform(a[0], a[-1], check) for a in axes]
+        exact = np.array([evaluate(X) for X in zip(*P)])
+        table.error = float(np.max(np.abs(table(*P) - exact)))
+    logger.debug(f'@surrogate: {var!r} @ {obj} tabulated {table}')
+    return table
@@ -1,7 +1,8 @@
-from .statevar import statevar, system, systemproxy
+from .statevar import proxy, statevar, system, systemproxy
 from .unit import U
 from collections import ChainMap
 from functools import reduce
+import itertools
 
 # ChainMap order is backwards like multiple inheritance
 decorators = (statevar, system, systemproxy)
@@ -29,6 +30,8 @@ class TrackableMeta(type):
             setattr(cls, key, d)
         remember(cls, '_trackable', var_namespace)
         [remember(cls, k, n) for k, n in ns.items()]
+        # vars changing over time, proxies (i.e. @parameter) need no update after first
+        cls._trackable_dynamic = {k: v for k, v in cls._trackable.items() if not isinstance(v, proxy)}
         return cls
 
 class Trackable(metaclass=TrackableMeta):
@@ -57,20 +60,21 @@ class Trackable(metaclass=TrackableMeta):
 
 class Configurable:
     def option(self, *keys, config):
-        def expand(k):
-            if isinstance(k, System):
-                #HACK: populate base classes down to System (not inclusive) for section names
-                S = k.__class__.mro()
-                return [s.__name__ for s in S[:S.index(System)]]
-            if isinstance(k, statevar):
-                return [k.__name__] + k._alias_lst
-            if callable(k):
-                return k.__name__
-            else:
-                return k
-        keys = [expand(k) for k in keys]
+        keys = [self._expand(k) for k in keys]
         return self._option(*keys, config=config)
 
+    def _expand(self, k):
+        if isinstance(k, System):
+            #HACK: populate base classes down to System (not inclusive) for section names
+            S = k.__class__.mro()
+            return [s.__name__ for s in S[:S.index(System)]]
+        if isinstance(k, statevar):
+            return [k.__name__] + k._alias_lst
+        if callable(k):
+            return k.__name__
+        else:
+            return k
+
     def _option(self, *keys, config):
         if not keys:
             return config
@@ -86,7 +90,36 @@ class Configurable:
             except KeyError:
                 return None
 
+    def search(self, *keys, index):
+        # same as option() but probing flattened index of config in the order of precedence
+        keys = [self._expand(k) for k in keys]
+        keys = [k if isinstance(k, list) else [k] for k in keys]
+        for path in itertools.product(*keys):
+            v = index.get(path)
+            if v is not None:
+                return v
+
+def flatten(config, prefix=()):
+    # {(section, name, ...): value} for every path into nested config
+    d = {}
+    for k, v in config.items():
+        p = prefix + (k,)
+        d[p] = v
+        if isinstance(v, dict):
+            d.update(flatten(v, p))
+    return d
+
 class System(Trackable, Configurable):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        # key of Systems built directly (i.e. in @derive) by order of creation under parent,
+        # replaced by path of creation when made by instance(), @system or @produce
+        p = kwargs.get('parent', kwargs.get('context'))
+        if p is not None:
+            n = p.__dict__.get('_constructed', 0)
+            p._constructed = n + 1
+            self._seed_key = p._seed_key + (self.__class__.__name__, n)
+
     def __getitem__(self, name):
         # support direct specification of value, i.e. 0
         # support string value with unit, i.e. '1 m'
@@ -105,10 +138,30 @@ class System(Trackable, Configurable):
     def setup(self):
         return {}
 
+    def update(self):
+        # skip until next step when updated less often than clock, variables are still computed on demand
+        s = self._timestep
+        if s is not None and not (isinstance(s, str) and s.split('.')[0] in self._trackable):
+            t = self.context.time
+            try:
+                s = self.__dict__['_timestep_value']
+            except KeyError:
+                s = self._timestep_value = U.magnitude(self[s], U[t])
+            k = U.magnitude(t) // s
+            if k == self.__dict__.get('_timestep_count'):
+                return
+            self._timestep_count = k
+        if self.__dict__.get('_updated'):
+            [v.get(self) for v in self._trackable_dynamic.values()]
+        else:
+            super().update()
+            self._updated = True
+
     def option(self, *keys, config=None):
         if config is None:
-            config = self.context._config
-        v = super().option(self, *keys, config=config)
+            v = self.context.lookup(self, *keys)
+        else:
+            v = super().option(self, *keys, config=config)
         return self[v]
 
     def collect(self, recursive=True, exclude_self=True):
@@ -139,6 +192,20 @@ class System(Trackable, Configurable):
     parent = system()
     children = system([])
 
+    # default timestep of variables updated less often than clock, i.e. '1 day'
+    _timestep = None
+
+    # path of creation from context identifying random stream, see rng.py
+    _seed_key = ()
+
+    @property
+    def rng(self):
+        try:
+            return self.__dict__['_rng']
+        except KeyError:
+            self._rng = r = self.context.stream(self._seed_key)
+            return r
+
     @property
     def neighbors(self):
         s = {self.parent} if self.parent is not None else {}
@@ -1,5 +1,33 @@
 from .logger import logger
 
+import contextlib
+
+class Scope:
+    # tracks visited while searching in @optimize, and those depending on the unknown
+    def __init__(self, *dependents, name='', depth=None):
+        self.tracks = set()
+        self.dependents = set(dependents)
+        self.count = 0
+        # tracks read directly at given depth of stack, not through other variables
+        self.depth = depth
+        self.reads = set()
+        # prefix of regimes numbered by evaluation, i.e. 'optimize-S-x'
+        self.name = name
+        self.evaluations = 0
+
+    def visit(self, tr, dependent=False, depth=None):
+        self.tracks.add(tr)
+        if depth is not None and depth == self.depth:
+            self.reads.add(tr)
+        if dependent:
+            self.dependents.add(tr)
+        if tr in self.dependents:
+            self.count += 1
+
+    @property
+    def independents(self):
+        return self.tracks - self.dependents
+
 class Trace:
     def __init__(self):
         self.reset()
@@ -7,6 +35,8 @@ class Trace:
     def reset(self):
         self._stack = []
         self._regime = ['']
+        self.scopes = []
+        self.profiler = None
 
     @property
     def stack(self):
@@ -66,12 +96,57 @@ class Trace:
         s = self.peek()
         self.push(v, regime=r)
         logger.trace(f'{self.indent}> {v.__name__} ({r}) - {self._stack}')
+        if self.profiler is not None:
+            self.profiler.enter(v, o)
         return self
 
     def __exit__(self, *excs):
+        if self.profiler is not None:
+            self.profiler.exit()
         v = self.pop()
         #logger.trace(f'{self.indent}< {v.__name__} - {self._stack}')
 
+    def scope(self, scope):
+        self.scopes.append(scope)
+
+    def unscope(self):
+        return self.scopes.pop()
+
+    @contextlib.contextmanager
+    def evaluate(self, scope):
+        # each evaluation gets a new regime, but only tracks depending on the unknown
+        # are recomputed after the first evaluation which collects them in scope
+        regime = f'{scope.name}-{scope.evaluations}'
+        first = scope.evaluations == 0
+        if first:
+            self.scope(scope)
+        else:
+            for t in scope.independents:
+                t._regime = regime
+        scope.evaluations += 1
+        try:
+            yield regime
+        finally:
+            if first:
+                self.unscope()
+
+    def visit(self, tr, dependent=False):
+        if not self.scopes:
+            return
+        d = len(self.stack)
+        for s in self.scopes:
+            s.visit(tr, dependent, d)
+
+    def store(self, tr, v):
+        if not self.scopes:
+            return tr.store(v)
+        # mark as dependent when any dependent track was visited during computation
+        C = [s.count for s in self.scopes]
+        tr.store(v)
+        for s, c in zip(self.scopes, C):
+            if s.count != c:
+                s.dependents.add(tr)
+
     def is_stacked(self, var):
         return len([v for v in self.stack if v is var]) > 1
 
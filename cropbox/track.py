@@ -41,13 +41,18 @@ class Track:
         return self._value
 
 class Accumulate(Track):
+    # number of rates kept, older ones are folded into checkpoint value
+    window = 8
+
     def reset(self, t):
         super().reset(t)
         self._rates = {}
         self._value_cache = {}
+        # value at the time of the first rate kept
+        self._checkpoint = self._initial_value
 
     def store(self, v):
-        v = self._initial_value
+        v = self._checkpoint
         R = self._rates
         T0 = list(R.keys())
         for t in reversed(T0):
@@ -71,11 +76,21 @@ class Accumulate(Track):
             self._rates[t] = v()
             V = self._value_cache
             self._value_cache = {k: V[k] for k in V if k == t}
+            self.compact()
         if self._regime == '':
             return f
         else:
             return None
 
+    def compact(self):
+        R = self._rates
+        while len(R) > self.window:
+            T = iter(R)
+            t0, t1 = next(T), next(T)
+            r = R.pop(t0)
+            if r is not None:
+                self._checkpoint = self._checkpoint + r * (t1 - t0)
+
 class Difference(Accumulate):
     def poststore(self, v):
         t = self.timer.t
@@ -113,3 +128,11 @@ class Preserve(Track):
     def store(self, v):
         super().store(v)
         self._stored = True
+
+class Solve(Track):
+    def reset(self, t):
+        super().reset(t)
+        # solution of last step for warm start
+        self._solution = None
+        # (time, solution) prepared by batch solve with other instances
+        self._solved = None
@@ -1,9 +1,23 @@
-import pint
 import numpy as np
+import os
 
 class Unit:
-    def __init__(self):
-        r = pint.UnitRegistry(autoconvert_offset_to_baseunit=True)
+    def __getattr__(self, name):
+        #HACK: build registry on first use as importing pint and parsing its definitions is slow
+        if name == 'registry':
+            self.registry = r = self.setup()
+            return r
+        raise AttributeError(name)
+
+    def setup(self):
+        import pint
+        from .cache import directory
+        try:
+            # parsed definitions are cached on disk so that new processes skip parsing
+            r = pint.UnitRegistry(autoconvert_offset_to_baseunit=True, cache_folder=os.path.join(directory(), 'pint'))
+        except (TypeError, OSError):
+            # older pint without cache_folder, or cache directory not writable
+            r = pint.UnitRegistry(autoconvert_offset_to_baseunit=True)
         r.default_format = '~P'
         #r.setup_matplotlib()
         r.define('percent = 0.01*count')
@@ -15,7 +29,7 @@ class Unit:
         r.define('CH2O = []')
         r.define('Quanta = []')
         r.define('Electron = []')
-        self.registry = r
+        return r
 
     def __call__(self, v, unit=None):
         if v is None:
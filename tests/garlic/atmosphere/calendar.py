@@ -1,4 +1,5 @@
 import datetime
+import pandas as pd
 import pytz
 
 JULIAN_EPOCH_USDA = 2415078.5 # 1990-03-01
@@ -14,6 +15,17 @@ def datetime_from_julian_day_WEA(year, jday, time='00:00', tzinfo=None, fold=0):
         #return d.replace(fold=fold).astimezone(tzinfo)
         return tzinfo.localize(d)
 
+def datetimes_from_julian_day_WEA(year, jday, time='00:00', tzinfo=None):
+    # vectorized version of datetime_from_julian_day_WEA() for whole columns
+    d = pd.to_datetime(pd.Series(year).astype(str), format='%Y') \
+        + pd.to_timedelta(pd.Series(jday) - 1, unit='D') \
+        + pd.to_timedelta(pd.Series(time).astype(str) + ':00')
+    d = pd.DatetimeIndex(d)
+    if tzinfo is None:
+        return d
+    else:
+        return d.tz_localize(tzinfo, ambiguous='infer')
+
 def julian_day_from_datetime(clock):
     return int(clock.strftime('%j'))
 
@@ -1,12 +1,19 @@
 from cropbox.system import System
 from cropbox.statevar import constant, derive, drive, parameter, system
+from cropbox import cache
+from cropbox.driver import Archive, Driver
 
 from .vaporpressure import VaporPressure
 from .sun import Sun
-from .calendar import datetime_from_julian_day_WEA
+from .calendar import datetimes_from_julian_day_WEA
 
 import pandas as pd
 
+def read_wea(filename, timezone=None):
+    df = pd.read_csv(filename, sep=r'\s+')
+    df['timestamp'] = datetimes_from_julian_day_WEA(df.year, df.jday, df.time)
+    return df.set_index('timestamp').tz_localize(timezone, ambiguous='infer')
+
 #TODO: use improved @drive
 #TODO: implement @unit
 class Weather(System):
@@ -26,11 +33,32 @@ class Weather(System):
     def timezone(self):
         return None
 
-    @constant(alias='df')
-    def dataframe(self, filename, timezone):
-        df = pd.read_csv(filename, sep='\s+')
-        df['timestamp'] = df.apply(lambda r: datetime_from_julian_day_WEA(r.year, r.jday, r.time, tzinfo=None), axis=1)
-        return df.set_index('timestamp').tz_localize(timezone, ambiguous='infer')
+    # i.e. 'linear' for sub-hourly clock, {'Tair': 'mean', 'SolRad': 'sum', ...} for daily clock
+    @parameter(init=None)
+    def interpolation(self):
+        return None
+
+    # multi-site store built by Archive.build(), used instead of filename when given
+    @parameter(init=None)
+    def archive(self):
+        return None
+
+    @parameter(init=None)
+    def site(self):
+        return None
+
+    @constant
+    def driver(self, filename, timezone, archive, site, interpolation, interval='context.interval'):
+        def resample(d):
+            if interpolation is None:
+                return d
+            else:
+                return d.resample(interval, method=interpolation)
+        if archive is not None:
+            return resample(Archive(archive).select(site))
+        # parsed once per (file content, timezone, resampling), later runs share memory-mapped cache
+        build = lambda: resample(Driver.from_dataframe(read_wea(filename, timezone)))
+        return cache.driver(build, timezone, interpolation, interpolation and interval, files=[filename], name='wea')
 
     @derive
     def key(self):
@@ -38,7 +66,7 @@ class Weather(System):
 
     @derive
     def store(self):
-        return self.df.loc[self.key]
+        return self.driver.loc(self.key)
         #return {'SolRad': 1500, 'CO2': 400, 'RH': 0.6, 'T_air': 25, 'wind': 2.0, 'P_air': 100}
 
     @drive(alias='PFD', key='SolRad', unit='umol/m^2/s Quanta')
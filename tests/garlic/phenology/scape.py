@@ -23,9 +23,9 @@ class Scape(Stage):
 class ScapeAppearance(Stage):
     scape = systemproxy()
 
-    @flag
+    @flag(threshold=('rate', 3.0))
     def over(self):
-        return self.rate >= 3.0 and not self.pheno.scape_removal.over
+        return not self.pheno.scape_removal.over
 
     # def finish(self):
     #     print(f"* Scape Tip Visible: time = {self.time}, leaves = {self.pheno.leaves_appeared} / {self.pheno.leaves_initiated}")
@@ -56,9 +56,9 @@ class ScapeRemoval(Stage):
 class Flowering(Stage):
     scape = systemproxy()
 
-    @flag
+    @flag(threshold=('rate', 5.0))
     def over(self):
-        return self.rate >= 5.0 and not self.pheno.scape_removal.over
+        return not self.pheno.scape_removal.over
 
     # def finish(self):
     #     print(f"* Inflorescence Visible and Flowering: time = {self.time}")
@@ -67,9 +67,9 @@ class Flowering(Stage):
 class Bulbiling(Stage):
     scape = systemproxy()
 
-    @flag
+    @flag(threshold=('rate', 5.5))
     def over(self):
-        return self.rate >= 5.5 and not self.pheno.scape_removal.over
+        return not self.pheno.scape_removal.over
 
     # def finish(self):
     #     print(f"* Bulbil and Bulb Maturing: time = {self.time}")
@@ -0,0 +1,124 @@
+from cropbox import cache
+from cropbox.system import System
+from cropbox.statevar import accumulate, parameter
+from cropbox.run import run
+
+import pandas as pd
+import sys
+import time
+
+def test_save_load_dataframe(tmp_path):
+    index = pd.date_range('2019-01-01', periods=2, freq='h', tz='Asia/Seoul', name='timestamp')
+    df1 = pd.DataFrame({'a': [1, 3], 'b': [2, 4]}, index=index)
+    cache.save_dataframe(df1, tmp_path/'df.npz')
+    df2 = cache.load_dataframe(tmp_path/'df.npz')
+    assert (df1.index == df2.index).all() and str(df2.index.tz) == 'Asia/Seoul'
+    assert (df1.a == df2.a).all() and (df1.b == df2.b).all()
+
+def test_driver(tmp_path, monkeypatch):
+    from cropbox.driver import Driver
+    monkeypatch.setenv('CROPBOX_CACHE', str(tmp_path))
+    n = 0
+    def build():
+        nonlocal n
+        n += 1
+        return Driver([0, 1, 2], {'a': [0, 10, 20]})
+    d1 = cache.driver(build, 'key')
+    d2 = cache.driver(build, 'key')
+    assert n == 1
+    assert list(d1['a']) == list(d2['a']) == [0, 10, 20]
+
+class S(System):
+    @parameter
+    def a(self):
+        return 1
+    @accumulate
+    def x(self):
+        return self.a
+
+def test_run(tmp_path, monkeypatch):
+    monkeypatch.setenv('CROPBOX_CACHE', str(tmp_path))
+    n = 0
+    def build():
+        nonlocal n
+        n += 1
+        return run(S, config, 3, ['x'])
+    config = {'S': {'a': 2}}
+    df1 = cache.run(build, S, config, 3, ['x'])
+    df2 = cache.run(build, S, config, 3, ['x'])
+    assert n == 1 and list(df1['x']) == list(df2['x']) == [0, 2, 4, 6]
+    cache.run(build, S, {'S': {'a': 3}}, 3, ['x'])
+    assert n == 2
+    df = run(S, config, 3, ['x'], cache=True)
+    assert list(df.index) == [0, 1, 2, 3] and list(df['x']) == [0, 2, 4, 6]
+
+def test_run_with_submodule(tmp_path, monkeypatch):
+    import importlib, sys
+    monkeypatch.setenv('CROPBOX_CACHE', str(tmp_path/'cache'))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    m = tmp_path/'model'
+    m.mkdir()
+    (m/'__init__.py').write_text('')
+    (m/'sub.py').write_text('from cropbox.system import System\nclass T(System):\n    pass\n')
+    (m/'main.py').write_text('from cropbox.system import System\nfrom cropbox.statevar import system\nfrom .sub import T\nclass S(System):\n    t = system(T)\n')
+    main = importlib.import_module('model.main')
+    assert cache.source(main.S) is not None
+    n = 0
+    def build():
+        nonlocal n
+        n += 1
+        return run(main.S, None, 1)
+    cache.run(build, main.S, None, 1, [])
+    cache.run(build, main.S, None, 1, [])
+    assert n == 1
+    # editing subsystem module invalidates cached run
+    (m/'sub.py').write_text('from cropbox.system import System\nclass T(System):\n    a = 1\n')
+    cache.run(build, main.S, None, 1, [])
+    assert n == 2
+    for k in [k for k in sys.modules if k.startswith('model')]:
+        monkeypatch.delitem(sys.modules, k)
+
+def test_run_interactive(tmp_path, monkeypatch):
+    import linecache, types
+    monkeypatch.setenv('CROPBOX_CACHE', str(tmp_path))
+    # classes defined in notebook cells or stdin have no module file
+    m = types.ModuleType('interactive')
+    monkeypatch.setitem(sys.modules, 'interactive', m)
+    def define(cell, a):
+        code = f'from cropbox.system import System\nfrom cropbox.statevar import accumulate\nclass S(System):\n    @accumulate\n    def x(self):\n        return {a}\n'
+        if cell is not None:
+            # as IPython registers cell source
+            lines = code.splitlines(True)
+            monkeypatch.setitem(linecache.cache, cell, (len(code), None, lines, cell))
+        exec(compile(code, cell or '<stdin>', 'exec'), m.__dict__)
+        return m.S
+    S1 = define('<cell-1>', 1)
+    assert list(run(S1, None, 3, ['x'], cache=True)['x']) == [0, 1, 2, 3]
+    S2 = define('<cell-2>', 5)
+    assert list(run(S2, None, 3, ['x'], cache=True)['x']) == [0, 5, 10, 15]
+    # source not found, not cached
+    S3 = define(None, 2)
+    assert cache.source(S3) is None
+    assert list(run(S3, None, 3, ['x'], cache=True)['x']) == [0, 2, 4, 6]
+    assert len(list(tmp_path.glob('run-*.npz'))) == 2
+
+def test_evict(tmp_path, monkeypatch):
+    monkeypatch.setenv('CROPBOX_CACHE', str(tmp_path))
+    P = []
+    for a in range(3):
+        run(S, {'S': {'a': a}}, 3, ['x'], cache=True)
+        P.append(max(tmp_path.glob('run-*.npz'), key=lambda p: p.stat().st_mtime_ns))
+        time.sleep(0.01)
+    # touch the oldest one
+    run(S, {'S': {'a': 0}}, 3, ['x'], cache=True)
+    cache.evict(2 * P[0].stat().st_size)
+    assert P[0].exists() and not P[1].exists() and P[2].exists()
+
+def test_unit_registry(tmp_path):
+    import os, subprocess, sys
+    code = 'from cropbox.unit import U; print(U("1 m").to("cm"))'
+    env = dict(os.environ, CROPBOX_CACHE=str(tmp_path))
+    for _ in range(2):
+        out = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True, text=True, check=True).stdout
+        assert out.strip() == '100.0 cm'
+    assert any((tmp_path/'pint').iterdir())
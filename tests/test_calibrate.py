@@ -0,0 +1,43 @@
+from cropbox.system import System
+from cropbox.statevar import accumulate, parameter
+from cropbox.run import configure, run
+from cropbox.calibrate import calibrate
+
+import pytest
+
+class S(System):
+    @parameter
+    def a(self):
+        return 1
+    @parameter
+    def b(self):
+        return 0
+    @accumulate
+    def x(self):
+        return self.a * self.context.time + self.b
+
+def test_run():
+    df = run(S, configure({}, {'S.a': 2}), steps=3, outputs=['x', 'context.time'])
+    assert list(df.index) == [0, 1, 2, 3]
+    assert list(df['x']) == [0, 0, 2, 6]
+
+def test_calibrate():
+    obs = run(S, configure({}, {'S.a': 2, 'S.b': 1}), steps=10, outputs=['x'])
+    r = calibrate(S, {'S.a': (0, 5), 'S.b': (-2, 2)}, obs, steps=10, popsize=10, target=0.05, seed=0)
+    assert r.x['S.a'] == pytest.approx(2, abs=0.05)
+    assert r.x['S.b'] == pytest.approx(1, abs=0.1)
+
+def test_calibrate_with_target():
+    obs = run(S, configure({}, {'S.a': 2}), steps=5, outputs=['x'])
+    memo = {}
+    r = calibrate(S, {'S.a': (0, 5)}, obs, steps=5, target=1, seed=0, memo=memo)
+    assert r.message == 'target loss reached' and r.fun <= 1
+    assert len(memo) == r.nfev
+    # already evaluated vectors are not run again
+    r = calibrate(S, {'S.a': (0, 5)}, obs, steps=5, target=1, seed=0, memo=memo)
+    assert r.nfev == 0
+
+def test_calibrate_parallel():
+    obs = run(S, configure({}, {'S.a': 2}), steps=5, outputs=['x'])
+    r = calibrate(S, {'S.a': (0, 5)}, obs, steps=5, popsize=4, maxiter=5, workers=2, seed=0)
+    assert r.x['S.a'] == pytest.approx(2, abs=0.5)
@@ -0,0 +1,136 @@
+from cropbox.system import System
+from cropbox.context import instance
+from cropbox.statevar import constant, drive
+from cropbox.driver import Driver
+
+import datetime
+import numpy as np
+import pandas as pd
+import pytest
+
+def test_locate():
+    d = Driver([0, 1, 2, 3], {'a': [0, 10, 20, 30]})
+    assert d.locate(2) == 2
+    assert d.loc(3)['a'] == 30
+    with pytest.raises(KeyError):
+        d.locate(1.5)
+
+def test_locate_irregular():
+    d = Driver([0, 1, 3, 7], {'a': [0, 10, 30, 70]})
+    assert d._step is None
+    assert d.loc(3)['a'] == 30 and d.loc(7)['a'] == 70
+    with pytest.raises(KeyError):
+        d.locate(2)
+
+def test_locate_datetime():
+    index = pd.date_range('2019-01-01', periods=24, freq='h', tz='Asia/Seoul')
+    df = pd.DataFrame({'a': range(24)}, index=index)
+    d = Driver.from_dataframe(df)
+    assert d.loc(datetime.datetime(2019, 1, 1, 5))['a'] == 5
+    assert d.loc(index[7])['a'] == 7
+    assert d.loc(index[7].tz_convert('UTC'))['a'] == 7
+    assert (d.to_dataframe() == df).all().all()
+
+def test_drive_with_driver():
+    class S(System):
+        @constant
+        def driver(self):
+            return Driver([0, 1, 2, 3], {'a': [0, 10, 20, 30]})
+        @drive
+        def a(self):
+            return self.driver.loc(self.context.time)
+    s = instance(S)
+    c = s.context
+    assert c.time == 0 and s.a == 0
+    c.advance()
+    assert c.time == 1 and s.a == 10
+    c.advance()
+    assert c.time == 2 and s.a == 20
+
+def test_drive_with_adaptive_clock():
+    from cropbox.statevar import accumulate
+    index = pd.date_range('2019-01-01', periods=240, freq='h')
+    df = pd.DataFrame({'a': np.sqrt(np.arange(240.) + 1)}, index=index)
+    class S(System):
+        @constant
+        def driver(self):
+            return Driver.from_dataframe(df)
+        @drive
+        def a(self):
+            return self.driver.loc(self.context.datetime)
+        @accumulate
+        def b(self):
+            return self.a
+    config = {'Clock': {'unit': 'hour', 'start_datetime': datetime.datetime(2019, 1, 1), 'adaptive': True, 'max_interval': 6}}
+    s = instance(S, config=config)
+    c = s.context
+    T = []
+    for _ in range(20):
+        c.advance()
+        T.append(c.time.magnitude)
+    # steps grow but stay on hourly grid of driver data
+    assert c.time.magnitude > 40
+    assert all(t == int(t) for t in T)
+
+def test_resample_interpolate():
+    d = Driver([0, 2, 4], {'a': [0, 20, 10], 'b': ['x', 'y', 'z']})
+    r = d.resample(1, method='linear')
+    assert list(r.index) == [0, 1, 2, 3, 4]
+    assert list(r['a']) == [0, 10, 20, 15, 10]
+    assert list(r['b']) == ['x', 'x', 'y', 'y', 'z']
+    r = d.resample(1, method={'a': 'step'})
+    assert list(r['a']) == [0, 0, 20, 20, 10]
+    r = d.resample(1, method='spline')
+    assert r['a'][2] == pytest.approx(20)
+
+def test_resample_aggregate():
+    index = pd.date_range('2019-01-01', periods=48, freq='h')
+    df = pd.DataFrame({'a': [1.]*24 + [3.]*24}, index=index)
+    d = Driver.from_dataframe(df)
+    r = d.resample(datetime.timedelta(days=1), method='mean')
+    assert len(r) == 2 and list(r['a']) == [1, 3]
+    r = d.resample(datetime.timedelta(days=1), method={'a': 'sum'})
+    assert list(r['a']) == [24, 72]
+    r = d.resample(datetime.timedelta(days=1), method='max')
+    assert r.loc(datetime.datetime(2019, 1, 2))['a'] == 3
+
+def test_drive_with_resampled_driver():
+    class S(System):
+        @constant
+        def driver(self, interval='context.interval'):
+            return Driver([0, 1, 2], {'a': [0, 10, 20]}).resample(interval, method='linear')
+        @drive
+        def a(self):
+            return self.driver.loc(self.context.time)
+    s = instance(S, config={'Clock': {'interval': 0.5}})
+    c = s.context
+    assert c.time == 0 and s.a == 0
+    c.advance()
+    assert c.time == 0.5 and s.a == 5
+    c.advance()
+    assert c.time == 1 and s.a == 10
+
+def test_save_load(tmp_path):
+    index = pd.date_range('2019-01-01', periods=3, freq='h', tz='Asia/Seoul')
+    df = pd.DataFrame({'a': [1., 2., 3.], 'b': ['x', 'y', 'z']}, index=index)
+    Driver.from_dataframe(df).save(tmp_path/'d')
+    d = Driver.load(tmp_path/'d')
+    assert not d['a'].flags.writeable
+    assert list(d['a']) == [1, 2, 3] and list(d['b']) == ['x', 'y', 'z']
+    assert d.loc(datetime.datetime(2019, 1, 1, 2))['a'] == 3
+    assert (d.to_dataframe().index == index).all()
+
+def test_archive(tmp_path):
+    from cropbox.driver import Archive
+    index = pd.date_range('2019-01-01', periods=24, freq='h', tz='Asia/Seoul')
+    data = {
+        'a': pd.DataFrame({'T': range(24)}, index=index),
+        (37, 127): pd.DataFrame({'T': range(100, 124)}, index=index),
+    }
+    Archive.build(tmp_path/'archive', data)
+    a = Archive(tmp_path/'archive')
+    assert len(a) == 2 and 'a' in a and (37, 127) in a
+    assert a['a'].loc(datetime.datetime(2019, 1, 1, 3))['T'] == 3
+    assert a[37, 127].loc(datetime.datetime(2019, 1, 1, 3))['T'] == 103
+    d = a.select((37, 127), start=datetime.datetime(2019, 1, 1, 10), end=datetime.datetime(2019, 1, 1, 12))
+    assert list(d['T']) == [110, 111, 112]
@@ -0,0 +1,96 @@
+from cropbox.system import System
+from cropbox.context import instance
+from cropbox.statevar import accumulate, derive, optimize, parameter, solve
+from cropbox.dual import Dual, gradient, seed, value
+from cropbox.unit import U
+
+import numpy as np
+import pytest
+
+def test_dual():
+    a = Dual(2., [1, 0])
+    b = Dual(3., [0, 1])
+    c = a * b + a / b - a**2
+    assert c.value == pytest.approx(6 + 2/3 - 4)
+    assert list(c.grad) == pytest.approx([3 + 1/3 - 4, 2 - 2/9])
+    e = np.exp(a) * np.float64(2)
+    assert list(e.grad) == pytest.approx([2*np.exp(2), 0])
+    assert a < b and max(a, b) is b
+
+def test_accumulate():
+    class S(System):
+        @parameter
+        def k(self):
+            return 1
+        @accumulate
+        def x(self):
+            return self.k
+        @derive
+        def y(self):
+            return np.exp(self.k * self.context.time)
+    s = instance(S, config=seed({}, {'S.k': 0.5}))
+    c = s.context
+    for _ in range(4):
+        c.advance()
+    assert value(s.x) == 2 and list(gradient(s.x, 1)) == [4]
+    assert list(gradient(s.y, 1)) == pytest.approx([4*np.exp(2)])
+
+def test_unit():
+    class S(System):
+        @parameter(unit='m')
+        def l(self):
+            return 1
+        @derive(unit='m^2')
+        def a(self):
+            return self.l**2
+    s = instance(S, config=seed({}, {'S.l': U(2, 'm')}))
+    assert value(s.a) == U(4, 'm^2')
+    assert list(gradient(s.a, 1)) == [4]
+
+def test_optimize():
+    class S(System):
+        @parameter
+        def k(self):
+            return 1
+        @optimize(lower=0, upper=100)
+        def x(self):
+            return self.x - self.k**2
+        @derive
+        def y(self):
+            return 3 * self.x
+    s = instance(S, config=seed({}, {'S.k': 3}))
+    assert value(s.x) == pytest.approx(9)
+    assert list(gradient(s.x, 1)) == pytest.approx([6], rel=1e-4)
+    assert list(gradient(s.y, 1)) == pytest.approx([18], rel=1e-4)
+
+def test_optimize_minimize():
+    class S(System):
+        @parameter
+        def k(self):
+            return 1
+        @optimize
+        def x(self):
+            return (self.x - 2*self.k)**2
+    s = instance(S, config=seed({}, {'S.k': 3}))
+    assert value(s.x) == pytest.approx(6, abs=1e-4)
+    assert list(gradient(s.x, 1)) == pytest.approx([2], rel=1e-3)
+
+def test_solve():
+    class S(System):
+        @parameter
+        def k(self):
+            return 1
+        @parameter
+        def m(self):
+            return 1
+        @solve(group='xy')
+        def x(self):
+            return (self.y + self.k) / 2
+        @solve(group='xy')
+        def y(self):
+            return self.x * self.m
+    s = instance(S, config=seed({}, {'S.k': 2, 'S.m': 0.5}))
+    # x = k / (2 - m), y = m x
+    assert value(s.x) == pytest.approx(4/3)
+    assert list(gradient(s.x, 2)) == pytest.approx([1/1.5, 2/1.5**2], rel=1e-4)
+    assert list(gradient(s.y, 2)) == pytest.approx([0.5/1.5, 4/3 + 0.5*2/1.5**2], rel=1e-4)
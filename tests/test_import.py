@@ -0,0 +1,24 @@
+import subprocess
+import sys
+
+def test_lazy_import():
+    # heavy dependencies should be loaded on first use, not on import
+    code = 'import sys, cropbox.system, cropbox.context, cropbox.statevar; print(" ".join(sys.modules))'
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+    modules = set(out.split())
+    for m in ('scipy', 'pandas', 'pint', 'networkx', 'toml', 'astpretty'):
+        assert m not in modules
+
+def test_import_time():
+    # cumulative time reported by -X importtime, about 0.15 s here vs. 0.9 s with eager imports
+    code = 'import cropbox.system, cropbox.context, cropbox.statevar'
+    err = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], capture_output=True, text=True, check=True).stderr
+    total = 0
+    for l in err.splitlines():
+        if not l.startswith('import time:'):
+            continue
+        _, cumulative, name = l[len('import time:'):].split('|')
+        # top-level imports only as nested ones are included in their parents
+        if name.startswith(' cropbox'):
+            total += int(cumulative)
+    assert 0 < total < 500000
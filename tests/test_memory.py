@@ -0,0 +1,34 @@
+from cropbox.system import System
+from cropbox.context import instance
+from cropbox.statevar import accumulate, derive, produce
+from cropbox.memory import Monitor, account, sizeof
+
+def test_sizeof():
+    a = [1.5] * 100
+    assert sizeof(a) > sizeof([]) and sizeof({'a': a}) > sizeof(a)
+
+def test_account():
+    class T(System):
+        @accumulate
+        def a(self):
+            return 1
+    class S(System):
+        @derive
+        def b(self):
+            return 1
+        @produce
+        def p(self):
+            return T
+    s = instance(S)
+    m = Monitor(s, every=2)
+    for _ in range(4):
+        s.context.advance()
+    df = account(s)
+    assert df.loc[('system', 'T', ''), 'count'] == 4
+    assert df.loc[('track', 'T', 'a'), 'count'] == 4 and df.loc[('track', 'T', 'a'), 'bytes'] > 0
+    assert df.loc[('track', 'S', 'b'), 'count'] == 1
+    assert ('pending', 'Context', '-1') in df.index
+    ts = m.series()
+    assert list(ts.index) == [2, 4]
+    assert ts.loc[4, 'T'] > ts.loc[2, 'T']
+    assert list(m.series(level='kind').columns) == ['pending', 'system', 'track']
@@ -0,0 +1,35 @@
+from cropbox.system import System
+from cropbox.context import instance
+from cropbox.statevar import accumulate, derive, optimize
+from cropbox.profiler import profile
+
+def test_profile(tmp_path):
+    class S(System):
+        @derive
+        def a(self):
+            return 1
+        @derive
+        def b(self):
+            return self.a + 1
+        @accumulate
+        def c(self):
+            return self.b
+        @optimize(lower=0, upper=10)
+        def x(self):
+            return self.x - self.b
+    with profile() as p:
+        s = instance(S)
+        s.context.advance()
+    assert s.x == 2
+    a, b, x = p.stats['S', 'a'], p.stats['S', 'b'], p.stats['S', 'x']
+    # once per step, others forced by iterations of @optimize
+    assert a.computes - a.forced == 2 and a.hits == a.calls - a.computes
+    assert b.forced > 0 and x.computes == 2
+    assert b.inclusive >= b.exclusive > 0
+    df = p.table()
+    assert df.loc[('S', 'x'), 'computes'] == 2
+    text = p.folded(tmp_path/'stacks.txt')
+    assert 'S.b;S.a ' in text and (tmp_path/'stacks.txt').read_text() == text
+    # profiling is off outside of the block
+    s.context.advance()
+    assert p.stats['S', 'x'].computes == 2
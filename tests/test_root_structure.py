@@ -12,11 +12,11 @@ def test_root_structure(tmp_path):
     class R(System):
         @derive(unit='cm / 1')
         def elongation_rate(self):
-            return random.gauss(1.0, 0.2)
+            return self.rng.normal(1.0, 0.2)
 
         @constant(unit='deg')
         def branching_angle(self):
-            return random.gauss(20, 10)
+            return self.rng.normal(20, 10)
 
         @parameter(unit='cm')
         def branching_interval(self):
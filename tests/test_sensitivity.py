@@ -0,0 +1,41 @@
+from cropbox.system import System
+from cropbox.statevar import derive, parameter
+from cropbox.sensitivity import morris, sobol
+
+import pytest
+
+class S(System):
+    @parameter
+    def a(self):
+        return 0
+    @parameter
+    def b(self):
+        return 0
+    @parameter
+    def c(self):
+        return 0
+    @derive
+    def y(self):
+        return self.a + 2*self.b
+    @derive
+    def z(self):
+        return self.a * self.c
+
+params = {'S.a': (0, 1), 'S.b': (0, 1), 'S.c': (0, 1)}
+
+def test_morris():
+    df = morris(S, params, ['y'], steps=0, trajectories=8, chunk=3, seed=0)
+    r = df.loc['y']
+    assert list(r.mu_star) == pytest.approx([1, 2, 0])
+    assert list(r.sigma) == pytest.approx([0, 0, 0])
+    assert (r.mu_star_lo <= r.mu_star).all() and (r.mu_star <= r.mu_star_hi).all()
+
+def test_sobol():
+    df = sobol(S, params, ['y', 'z'], steps=0, n=128, chunk=64, seed=0)
+    y = df.loc['y']
+    assert list(y.S1) == pytest.approx([0.2, 0.8, 0], abs=0.05)
+    assert list(y.ST) == pytest.approx([0.2, 0.8, 0], abs=0.05)
+    assert (y.S1_lo <= y.S1_hi).all()
+    z = df.loc['z']
+    # interaction shows up in total but not first-order indices
+    assert z.ST['S.a'] > z.S1['S.a'] and z.ST['S.b'] == pytest.approx(0, abs=0.01)
@@ -1,6 +1,6 @@
 from cropbox.system import System
 from cropbox.context import instance
-from cropbox.statevar import accumulate, constant, derive, difference, drive, flag, flip, optimize, parameter, produce, statevar, system, systemproxy
+from cropbox.statevar import accumulate, constant, derive, difference, drive, flag, flip, optimize, parameter, produce, solve, statevar, surrogate, system, systemproxy
 from cropbox.unit import U
 
 import pytest
@@ -48,6 +48,23 @@ def test_accumulate():
     c.advance()
     assert s.a == 1 and s.b == 6
 
+def test_accumulate_with_window():
+    class S(System):
+        @accumulate(unit='m')
+        def a(self):
+            return U(self.context.time, 'm')
+        @accumulate
+        def b(self):
+            return U.magnitude(self.a, 'm') + 1
+    s = instance(S)
+    c = s.context
+    tr = s._trackable['a'].data(s)[s._trackable['a']]
+    for _ in range(20):
+        c.advance()
+    # a(t) = t(t-1)/2, b(t) = sum of a(i) + 1 for i < t
+    assert s.a == U(190, 'm') and s.b == 1160
+    assert len(tr._rates) <= tr.window
+
 def test_accumulate_with_cross_reference():
     class S(System):
         @accumulate
@@ -351,6 +368,47 @@ def test_flag():
     assert not s.c and not s.d
     assert not s.e and not s.f
 
+def test_flag_with_seed():
+    class T(System):
+        @derive
+        def x(self):
+            return self.rng.normal()
+    class S(System):
+        @flag(prob=0.5)
+        def a(self):
+            return True
+        @produce
+        def p(self):
+            if self.a:
+                return T
+        t = system(T)
+    def run(seed):
+        s = instance(S, config={'Context': {'seed': seed}})
+        A = []
+        for _ in range(20):
+            s.context.advance()
+            A.append(s.a)
+        return A, [c.x for c in s.children], s.t.x
+    assert run(0) == run(0)
+    assert run(0) != run(1)
+    A, X, x = run(0)
+    # each system has its own stream
+    assert len(set(X)) == len(X) and x not in X
+
+def test_rng_of_direct_systems():
+    class T(System):
+        pass
+    class S(System):
+        @constant
+        def ts(self):
+            return [T(context=self.context, parent=self) for _ in range(3)]
+    def run(seed):
+        s = instance(S, config={'Context': {'seed': seed}})
+        return [t.rng.random() for t in s.ts]
+    X = run(0)
+    assert len(set(X)) == 3
+    assert run(0) == X
+
 def test_systemproxy():
     class T(System):
         @derive
@@ -361,6 +419,68 @@ def test_systemproxy():
     s = instance(S)
     assert s.a == s.t.a == 1
 
+def test_flag_with_threshold():
+    n = 0
+    class S(System):
+        @accumulate
+        def a(self):
+            return 1
+        @derive
+        def x(self):
+            return 3
+        b = flag(threshold=('a', 'x'))
+        @flag(threshold=('a', 'x'))
+        def c(self):
+            nonlocal n
+            n += 1
+            return self.a < 5
+        @flag(threshold=('a', 'x'), latch=True)
+        def d(self):
+            nonlocal n
+            n += 1
+            return self.a < 5
+    s = instance(S)
+    assert s.a == 0 and not s.b and not s.c and not s.d and n == 0
+    for _ in range(3):
+        s.context.advance()
+    assert s.a == 3 and s.b and s.c and s.d and n == 2
+    for _ in range(3):
+        s.context.advance()
+    assert s.a == 6 and s.b and not s.c and s.d and n == 5
+
+def test_schedule():
+    L = []
+    class S(System):
+        pass
+    s = instance(S, config={'Clock': {'unit': 'day'}})
+    c = s.context
+    c.schedule('2 day', lambda: L.append(('b', c.time)))
+    c.schedule(1, lambda: L.append(('a', c.time)))
+    c.schedule(U(2, 'day'), lambda: L.append(('c', c.time)))
+    for _ in range(3):
+        c.advance()
+    assert L == [('a', U(1, 'day')), ('b', U(2, 'day')), ('c', U(2, 'day'))]
+
+def test_schedule_with_adaptive():
+    L = []
+    class S(System):
+        @accumulate
+        def a(self):
+            return 1
+        f = flag(threshold=('a', 7.5))
+    s = instance(S, config={'Clock': {'adaptive': True, 'min_interval': 0.1, 'max_interval': 4}})
+    c = s.context
+    c.schedule(5, lambda: L.append(c.time))
+    T = []
+    while c.time < 10:
+        c.advance()
+        T.append(c.time)
+        if s.f:
+            break
+    # steps land on scheduled event and predicted threshold crossing
+    assert L == [5] and 5 in T
+    assert c.time == 7.5 and s.a == 7.5
+
 def test_produce():
     class S(System):
         @produce
@@ -436,6 +556,178 @@ def test_optimize_with_unit():
     assert s.x == U(1, 'm')
     assert s.a == s.b == U(2, 'm')
 
+def test_optimize_with_independent():
+    n = 0
+    class S(System):
+        @derive
+        def a(self):
+            nonlocal n
+            n += 1
+            return 2
+        @derive
+        def b(self):
+            return self.a*self.x
+        @optimize(lower=0, upper=2)
+        def x(self):
+            return self.b - 2
+    s = instance(S)
+    assert s.x == 1 and s.b == 2
+    # evaluated before, once while searching, and after optimization
+    assert n == 3
+
+def test_optimize_with_warm_start():
+    n = 0
+    class S(System):
+        @derive
+        def a(self):
+            return 1 + 0.01*self.context.time
+        @optimize(lower=0, upper=10)
+        def x(self):
+            nonlocal n
+            n += 1
+            return self.x**2 - self.a
+    s = instance(S)
+    c = s.context
+    assert s.x == pytest.approx(1)
+    n0 = n
+    c.advance()
+    assert s.x == pytest.approx(1.01**0.5)
+    assert n - n0 < n0
+
+def test_optimize_with_secant():
+    class S(System):
+        @derive
+        def a(self):
+            return 1 + self.context.time
+        @optimize(lower=0, upper=10, method='secant')
+        def x(self):
+            return self.x**2 - self.a
+    s = instance(S)
+    c = s.context
+    assert s.x == pytest.approx(1)
+    c.advance()
+    assert s.x == pytest.approx(2**0.5)
+    c.advance()
+    assert s.x == pytest.approx(3**0.5)
+
+def test_optimize_with_batch():
+    class T(System):
+        @constant(init=1)
+        def k(self):
+            return None
+        @derive
+        def a(self):
+            return self.k + self.context.time
+        @optimize(lower=0, upper=10, batch=True)
+        def x(self):
+            return self.x**2 - self.a
+    class S(System):
+        @system
+        def t1(self):
+            return T
+        t2 = system(T, k=4)
+        t3 = system(T, k=9)
+    s = instance(S)
+    c = s.context
+    assert s.t1.x == pytest.approx(1) and s.t2.x == pytest.approx(2) and s.t3.x == pytest.approx(3)
+    c.advance()
+    assert s.t1.x == pytest.approx(2**0.5) and s.t2.x == pytest.approx(5**0.5) and s.t3.x == pytest.approx(10**0.5)
+
+def test_solve():
+    class S(System):
+        @solve(group='ab')
+        def a(self):
+            return (self.b + 3) / 2
+        @solve(group='ab')
+        def b(self):
+            return self.a**2 / 4 - self.context.time
+        @derive
+        def c(self):
+            return self.a + self.b
+    s = instance(S)
+    c = s.context
+    assert s.a == pytest.approx(2) and s.b == pytest.approx(1) and s.c == pytest.approx(3)
+    c.advance()
+    # a = (a^2/4 + 2)/2
+    assert s.a == pytest.approx(4 - 8**0.5) and s.b == pytest.approx(2*s.a - 3)
+
+def test_solve_with_unit():
+    class S(System):
+        @solve(unit='degC')
+        def T(self):
+            return U(20, 'degC') + U(0.1, '1/degC') * (self.T - U(20, 'degC'))**2
+    s = instance(S)
+    assert U.magnitude(s.T, 'degC') == pytest.approx(20, abs=1e-3)
+
+def test_surrogate(tmp_path, monkeypatch):
+    monkeypatch.setenv('CROPBOX_CACHE', str(tmp_path))
+    n = 0
+    class S(System):
+        @derive
+        def x(self):
+            return self.context.time
+        @parameter
+        def k(self):
+            return 2
+        @surrogate(inputs={'x': (0, 4, 41)})
+        def y(self, x, k):
+            nonlocal n
+            n += 1
+            return k * x**2
+    s = instance(S)
+    c = s.context
+    assert s.y == 0
+    m = n
+    T = s._trackable['y'].table(s)
+    assert T.values.shape == (41,) and T.error < 0.01
+    c.advance()
+    c.advance()
+    assert s.x == 2 and s.y == pytest.approx(8)
+    assert n == m
+    c.advance()
+    c.advance()
+    c.advance()
+    # exact computation outside the table
+    assert s.x == 5 and s.y == 50
+    assert n == m + 1
+    # table is loaded from cache
+    s._trackable['y']._tables.clear()
+    n = 0
+    s = instance(S)
+    assert s.y == 0 and n == 0
+
+def test_surrogate_with_dependency(tmp_path, monkeypatch):
+    monkeypatch.setenv('CROPBOX_CACHE', str(tmp_path))
+    class T(System):
+        @constant(init=1)
+        def k(self):
+            return None
+        @derive
+        def x(self):
+            return 1.5
+        @surrogate(inputs={'x': (0, 4, 41)})
+        def y(self, x, k):
+            return k * x**2
+    class S(System):
+        t1 = system(T, k=1)
+        t2 = system(T, k=10)
+    s = instance(S)
+    assert s.t1.y == pytest.approx(2.25, rel=1e-2)
+    assert s.t2.y == pytest.approx(22.5, rel=1e-2)
+    assert len(T._trackable['y']._tables) == 2
+
+def test_surrogate_with_undeclared_input(tmp_path, monkeypatch):
+    monkeypatch.setenv('CROPBOX_CACHE', str(tmp_path))
+    class S(System):
+        @derive
+        def x(self):
+            return 1
+        @surrogate(inputs={'x': (0, 4, 41)})
+        def y(self, x):
+            return x + self.context.time
+    with pytest.raises(ValueError):
+        instance(S)
+
 def test_clock():
     class S(System):
         pass
@@ -458,6 +750,111 @@ def test_clock_with_config():
     c.advance()
     assert c.time == 25
 
+def test_clock_with_adaptive():
+    import math
+    class S(System):
+        @accumulate
+        def a(self):
+            return 1
+        @accumulate(init=1)
+        def b(self):
+            return 0.1 * self.b
+        @flag
+        def f(self):
+            return self.context.time >= 10
+    config = {'Clock': {'interval': 0.1, 'adaptive': True, 'tolerance': 1e-4, 'max_interval': 1}}
+    s = instance(S, config=config)
+    c = s.context
+    t = None
+    while c.time < 20:
+        if t is None and s.f:
+            t = c.time
+            # shortest step right after flag turned
+            assert c.step == 0.1
+        c.advance()
+    assert 10 <= t < 11
+    assert c.tick < 200
+    assert s.a == pytest.approx(c.time)
+    assert s.b == pytest.approx(math.exp(0.1 * c.time), rel=0.02)
+
+def test_clock_with_adaptive_constant():
+    class S(System):
+        @accumulate
+        def a(self):
+            return 2
+    s = instance(S, config={'Clock': {'adaptive': True, 'max_interval': 8}})
+    c = s.context
+    for _ in range(6):
+        c.advance()
+    assert c.step == 8
+    assert s.a == 2 * c.time
+
+def test_timestep():
+    n = 0
+    class T(System):
+        _timestep = 4
+        @derive
+        def a(self):
+            nonlocal n
+            n += 1
+            return self.context.time
+        @accumulate
+        def b(self):
+            return 1
+    class S(System):
+        t = system(T)
+        @accumulate(timestep=2)
+        def c(self):
+            return 1
+        @accumulate
+        def d(self):
+            return 1
+    s = instance(S)
+    c = s.context
+    for _ in range(6):
+        c.advance()
+    assert c.time == 6 and s.t.a == 4 and n == 2
+    assert s.t.b == 4 and s.c == 6 and s.d == 6
+    c.advance()
+    assert s.t.a == 4 and s.t.b == 4 and s.c == 6 and s.d == 7
+    c.advance()
+    assert s.t.a == 8 and s.t.b == 8 and s.c == 8 and n == 3
+
+def test_timestep_skip_update():
+    n = 0
+    class T(System):
+        _timestep = 4
+        @derive
+        def a(self):
+            nonlocal n
+            n += 1
+            return self.context.time
+        # user variable of the same name as option
+        @derive
+        def timestep(self):
+            return 1
+    class S(System):
+        t = system(T)
+    s = instance(S)
+    c = s.context
+    for _ in range(9):
+        c.advance()
+    assert n == 3 and s.t.timestep == 1
+    T._trackable['a'].get(s.t)
+    assert n == 3 and s.t.a == 8
+
+def test_timestep_with_unit():
+    class S(System):
+        _timestep = '1 day'
+        @accumulate(unit='hour')
+        def a(self):
+            return 1
+    s = instance(S, config={'Clock': {'unit': 'hour'}})
+    c = s.context
+    for _ in range(30):
+        c.advance()
+    assert s.a == U(24, 'hour')
+
 def test_clock_with_datetime():
     import datetime
     class S(System):
@@ -520,6 +917,22 @@ def test_args_with_config():
     s = instance(S, config={'S': {'a': {'b': 1}}})
     assert s.a == 1
 
+def test_option_with_reconfigure():
+    class R(System):
+        @parameter(alias='c')
+        def a(self):
+            return 0
+    class S(R):
+        @derive
+        def b(self, d=1):
+            return d
+    s = instance(S, config={'R': {'c': 1}, 'S': {'b': {'d': 2}}})
+    assert s.a == 1 and s.b == 2
+    assert s.option(s._trackable['a']) == 1
+    s.context.configure({'S': {'a': 3}})
+    assert s.option(s._trackable['a']) == 3
+    assert s.option(s._trackable['b']._wrapped_fun, 'd') is None
+
 def test_args_partial():
     class S(System):
         @derive